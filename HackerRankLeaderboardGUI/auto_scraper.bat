@@ -4,31 +4,28 @@ echo ================================================
 echo    HackerRank Leaderboard Auto Scraper
 echo ================================================
 echo Starting automatic scraping process...
-echo Script will run every 30 minutes
-echo Google Sheets upload will attempt every 2 hours
+echo Scraping every 30 minutes, uploading to Google Sheets every 2 hours
+echo (intervals come from .env and uploader_config.json)
 echo Press Ctrl+C to stop
 echo.
 
 cd /d "%~dp0"
 
 :loop
-echo [%date% %time%] Starting scraper...
-py cli_scraper_no_dotenv.py
+REM One resident process scrapes and uploads on its own schedule
+REM (SCRAPE_INTERVAL_MINUTES in .env, UPLOAD_INTERVAL_HOURS in uploader_config.json)
+echo [%date% %time%] Starting leaderboard daemon...
+py leaderboard_daemon.py
 if %errorlevel% neq 0 (
-    echo [%date% %time%] Error running scraper: %errorlevel%
+    echo [%date% %time%] Daemon exited with error: %errorlevel%
 ) else (
-    echo [%date% %time%] Scraper completed successfully
+    echo [%date% %time%] Daemon stopped
+    goto end
 )
 
-echo [%date% %time%] Attempting Google Sheets upload...
-py google_sheets_uploader.py
-if %errorlevel% neq 0 (
-    echo [%date% %time%] Error with Google Sheets upload: %errorlevel%
-) else (
-    echo [%date% %time%] Google Sheets upload process completed
-)
-
-echo [%date% %time%] Waiting 30 minutes before next run...
+echo [%date% %time%] Restarting in 60 seconds...
 echo.
-timeout /t 1800 /nobreak >nul
+timeout /t 60 /nobreak >nul
 goto loop
+
+:end
@@ -0,0 +1,267 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+
+
+class StubLeaderboardServer:
+    """Local stand-in for HackerRank's /rest/contests/{id}/leaderboard endpoint
+
+    Every contest serves `participants` synthetic hackers, generated
+    deterministically from the contest name. Latency and error profiles are
+    configurable: a fixed delay per request, a random share of 503 answers,
+    and a 429 (with Retry-After) on every n-th request.
+    """
+
+    def __init__(self, participants=1000, max_page_size=100, latency=0.0,
+                 error_rate=0.0, rate_limit_every=0, seed=0):
+        self.participants = participants
+        self.max_page_size = max_page_size
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit_every = rate_limit_every
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.request_count = 0
+        self.boards = {}
+        self.server = None
+
+    def board(self, contest):
+        """Synthetic leaderboard for a contest, built once and kept"""
+        with self.lock:
+            if contest not in self.boards:
+                rng = random.Random(contest)
+                # Half the names are shared between contests so merges have overlap
+                rows = [{
+                    'hacker': f'hacker_{i}' if i % 2 == 0 else f'{contest}_hacker_{i}',
+                    'score': float(rng.randint(0, 100)),
+                    'time_taken': rng.randint(0, 14 * 86400) if rng.random() > 0.05 else None,
+                } for i in range(self.participants)]
+                rows.sort(key=lambda r: -r['score'])
+                self.boards[contest] = rows
+            return self.boards[contest]
+
+    def handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def send_body(self, status, body=b'', headers=()):
+                self.send_response(status)
+                for key, value in headers:
+                    self.send_header(key, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                parts = url.path.strip('/').split('/')
+                if len(parts) != 4 or parts[:2] != ['rest', 'contests'] or parts[3] != 'leaderboard':
+                    self.send_body(404)
+                    return
+
+                with stub.lock:
+                    stub.request_count += 1
+                    count = stub.request_count
+                    fail = stub.random.random() < stub.error_rate
+                if stub.latency:
+                    time.sleep(stub.latency)
+                if stub.rate_limit_every and count % stub.rate_limit_every == 0:
+                    self.send_body(429, headers=[('Retry-After', '0')])
+                    return
+                if fail:
+                    self.send_body(503)
+                    return
+
+                query = parse_qs(url.query)
+                offset = int(query.get('offset', ['0'])[0])
+                limit = min(int(query.get('limit', ['100'])[0]), stub.max_page_size)
+                rows = stub.board(parts[2])
+                body = json.dumps({'models': rows[offset:offset + limit], 'total': len(rows)}).encode()
+                self.send_body(200, body, [('Content-Type', 'application/json')])
+
+        return Handler
+
+    def start(self):
+        """Start serving on a free local port and return the base URL"""
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self.handler())
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return f'http://127.0.0.1:{self.server.server_address[1]}'
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+def timed(results, stage, func, *args):
+    """Run func quietly and record its wall time under stage"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        value = func(*args)
+        results[stage] = round(time.perf_counter() - start, 4)
+    return value
+
+
+def run_size(participants, args):
+    """Benchmark every stage for one participant count"""
+    from cli_scraper_no_dotenv import HackerRankLeaderboardCLI
+
+    stub = StubLeaderboardServer(participants, args.page_size, args.latency,
+                                 args.error_rate, args.rate_limit_every)
+    base_url = stub.start()
+    contests = [f'bench-contest-{i + 1}' for i in range(args.contests)]
+    stages = {}
+    try:
+        with open('.env', 'w') as f:
+            f.write(f'BASE_URL={base_url}\n'
+                    f'OFFSET_LIMIT={args.page_size}\n'
+                    f'MAX_OFFSET={participants + args.page_size}\n'
+                    f'CONCURRENCY={args.concurrency}\n'
+                    f'REQUESTS_PER_SECOND=0\n'
+                    f'BACKOFF_BASE=0.05\n'
+                    f'ENABLE_CACHE=false\n')
+        with contextlib.redirect_stdout(io.StringIO()):
+            cli = HackerRankLeaderboardCLI()
+
+        frames = {}
+        for contest in contests:
+            frames[contest] = timed(stages, f'fetch:{contest}', cli.fetch_hackerrank_data, contest)
+        stages['fetch'] = round(sum(stages.pop(f'fetch:{c}') for c in contests), 4)
+        stages['requests'] = stub.request_count
+
+        df_total = timed(stages, 'merge', cli.build_total_leaderboard, frames, contests)
+        timed(stages, 'generateExcelSheet', cli.generateExcelSheet, 'TotalHackerrankLeaderBoard', df_total)
+        cli.close()
+
+        try:
+            from google_sheets_uploader import GoogleSheetsUploader
+        except ImportError as e:
+            stages['excel_to_csv_data'] = f'skipped ({e})'
+        else:
+            with contextlib.redirect_stdout(io.StringIO()):
+                uploader = GoogleSheetsUploader()
+            excel_file = Path('Leaderboards/TotalHackerrankLeaderBoard.xlsx')
+            timed(stages, 'excel_to_csv_data', uploader.excel_to_csv_data, excel_file)
+            # The same conversion without the CSV sidecar, i.e. parsing the xlsx
+            excel_file.with_suffix('.csv').unlink(missing_ok=True)
+            timed(stages, 'excel_to_csv_data_xlsx', uploader.excel_to_csv_data, excel_file)
+    finally:
+        stub.stop()
+
+    stages['rows'] = len(df_total)
+    return stages
+
+
+def cold_start(module, repeats):
+    """Best-of-n wall time for a fresh interpreter to import an entry-point module"""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', f'import {module}'], cwd=SCRIPT_DIR, check=True)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best, 4)
+
+
+def compare(current, baseline_file):
+    """Print each stage's time relative to an earlier results file"""
+    with open(baseline_file, 'r') as f:
+        baseline = json.load(f)
+    print(f"\n📈 Compared with {baseline_file}:")
+    for size, stages in current['results'].items():
+        previous = baseline.get('results', {}).get(size, {})
+        for stage, seconds in stages.items():
+            before = previous.get(stage)
+            if stage in ('rows', 'requests') or not isinstance(seconds, float) or not isinstance(before, float) or not before:
+                continue
+            ratio = seconds / before
+            flag = '  ⚠️ slower' if ratio > 1 + current['regression_threshold'] else ''
+            print(f"  {size:>7} {stage:<24} {before:8.3f}s -> {seconds:8.3f}s ({ratio:5.2f}x){flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the scraper and uploader against a local stub server')
+    parser.add_argument('--sizes', default='1000,10000,100000', help='comma-separated participant counts')
+    parser.add_argument('--contests', type=int, default=2, help='contests per run (merged into one board)')
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every request')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of requests answered with 503')
+    parser.add_argument('--rate-limit-every', type=int, default=0, help='answer every n-th request with 429')
+    parser.add_argument('--output-dir', default=str(SCRIPT_DIR / 'benchmark_results'))
+    parser.add_argument('--compare', help='earlier results JSON to compare against')
+    parser.add_argument('--regression-threshold', type=float, default=0.2)
+    parser.add_argument('--startup-repeats', type=int, default=5, help='cold starts per entry point (0 to skip)')
+    parser.add_argument('--startup-target', type=float, default=0.5,
+                        help='seconds a cold start of each entry point should stay under')
+    args = parser.parse_args()
+
+    import pandas as pd
+    import openpyxl
+
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'pandas': pd.__version__,
+        'openpyxl': openpyxl.__version__,
+        'settings': {k: v for k, v in vars(args).items() if k not in ('output_dir', 'compare')},
+        'startup_target': args.startup_target,
+        'regression_threshold': args.regression_threshold,
+        'results': {},
+    }
+
+    if args.startup_repeats > 0:
+        print(f"⏱️ Measuring cold start (best of {args.startup_repeats})...")
+        startup = {module: cold_start(module, args.startup_repeats)
+                   for module in ('cli_scraper_no_dotenv', 'google_sheets_uploader', 'leaderboard_daemon',
+                                  'leaderboard_api')}
+        report['results']['startup'] = startup
+        for module, seconds in startup.items():
+            flag = '  ⚠️ over target' if seconds > args.startup_target else ''
+            print(f"  {module:<24} {seconds}{flag}")
+
+    original_dir = os.getcwd()
+    for size in [int(s) for s in args.sizes.split(',') if s.strip()]:
+        print(f"⏱️ Benchmarking {size} participants x {args.contests} contest(s)...")
+        with tempfile.TemporaryDirectory() as work_dir:
+            os.chdir(work_dir)
+            try:
+                report['results'][str(size)] = run_size(size, args)
+            finally:
+                os.chdir(original_dir)
+        for stage, value in report['results'][str(size)].items():
+            print(f"  {stage:<24} {value}")
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_file = output_dir / f"benchmark-{datetime.now():%Y%m%d-%H%M%S}.json"
+    with open(output_file, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Results saved to: {output_file}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
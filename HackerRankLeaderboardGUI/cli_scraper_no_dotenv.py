@@ -1,11 +1,36 @@
+import time
+STARTED = time.perf_counter()
+
 import os
-import pandas as pd
+import sys
+import json
+import tempfile
 import warnings
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from array import array
 import requests
+from datetime import datetime, timedelta
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from fetch_engine import LeaderboardFetcher, FetchStats
+from page_cache import PageCache
+from metrics import Metrics
+from history_store import HistoryStore
+from ranking import TIE_METHODS, rank_board, top_k, assign_ranks
+from contest_jobs import ContestJob, load_jobs
+
+# pandas, numpy and openpyxl are imported where they are used, so reading the
+# config and a run that has nothing to write do not pay for loading them
 
 class HackerRankLeaderboardCLI:
+    # Cell styles shared by both Excel writers, built by excel_styles() on first use
+    EXCEL_STYLES = None
+    # Rows per worksheet (header included) allowed by the xlsx format
+    EXCEL_MAX_ROWS = 1048576
+    # Rows converted to Python values at a time by the fast Excel writer
+    EXCEL_CHUNK_ROWS = 10000
+    # Short combined board of the best TOP_BOARD_SIZE participants
+    TOP_BOARD = 'TopHackerrankLeaderBoard'
+
     def __init__(self):
         # Load configuration from .env file manually
         self.load_env_config()
@@ -24,7 +49,37 @@ class HackerRankLeaderboardCLI:
             'USER_AGENT': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/47.0.2526.80 Safari/537.36',
             'REQUEST_TIMEOUT': '10',
             'OFFSET_LIMIT': '100',
-            'MAX_OFFSET': '1000'
+            'MAX_OFFSET': '1000',
+            'CONCURRENCY': '4',
+            'REQUESTS_PER_SECOND': '10',
+            'MAX_RETRIES': '5',
+            'BACKOFF_BASE': '1',
+            'BACKOFF_MAX': '60',
+            'RESUME_WINDOW_MINUTES': '60',
+            'RANK_TIES': 'competition',
+            'TOP_BOARD_SIZE': '0',
+            'STREAMING': 'false',
+            'STREAM_RUN_SIZE': '100000',
+            'PIPELINE_CONTESTS': 'true',
+            'CONTEST_WORKERS': '2',
+            'EXCEL_WRITER': 'fast',
+            'EXCEL_PROCESSES': '0',
+            'ENABLE_CACHE': 'true',
+            'CACHE_DIR': 'Cache',
+            'FINISHED_CONTESTS': '',
+            'WRITE_SIDECAR': 'true',
+            'CONTESTS': 'coderally-6-0-training-weeks',
+            'JOBS_FILE': 'jobs.json',
+            'SCRAPE_INTERVAL_MINUTES': '30',
+            'API_ENABLED': 'false',
+            'API_HOST': '127.0.0.1',
+            'API_PORT': '8080',
+            'HISTORY_ENABLED': 'true',
+            'HISTORY_DB': 'history.db',
+            'METRICS_ENABLED': 'true',
+            'METRICS_FILE': 'metrics.jsonl',
+            'PROMETHEUS_DIR': '',
+            'BASE_URL': 'https://www.hackerrank.com'
         }
         
         # Try to read .env file
@@ -46,53 +101,186 @@ class HackerRankLeaderboardCLI:
         self.request_timeout = int(config['REQUEST_TIMEOUT'])
         self.offset_limit = int(config['OFFSET_LIMIT'])
         self.max_offset = int(config['MAX_OFFSET'])
+        self.concurrency = int(config['CONCURRENCY'])
+        self.requests_per_second = float(config['REQUESTS_PER_SECOND'])
+        self.max_retries = int(config['MAX_RETRIES'])
+        self.backoff_base = float(config['BACKOFF_BASE'])
+        self.backoff_max = float(config['BACKOFF_MAX'])
+        self.resume_window_minutes = float(config['RESUME_WINDOW_MINUTES'])
+        self.base_url = config['BASE_URL']
+        self.rank_ties = config['RANK_TIES'].lower()
+        if self.rank_ties not in TIE_METHODS:
+            print(f"Warning: Unknown RANK_TIES '{config['RANK_TIES']}', using competition ranking")
+            self.rank_ties = 'competition'
+        self.top_board_size = int(config['TOP_BOARD_SIZE'])
+        self.streaming = config['STREAMING'].lower() in ('1', 'true', 'yes')
+        self.stream_run_size = int(config['STREAM_RUN_SIZE'])
+        self.pipeline_contests = config['PIPELINE_CONTESTS'].lower() in ('1', 'true', 'yes')
+        self.contest_workers = max(1, int(config['CONTEST_WORKERS']))
+        self.excel_writer = config['EXCEL_WRITER'].lower()
+        self.excel_processes = int(config['EXCEL_PROCESSES'])
+        self.enable_cache = config['ENABLE_CACHE'].lower() in ('1', 'true', 'yes')
+        self.cache_dir = config['CACHE_DIR']
+        self.contest_ids = [c.strip() for c in config['CONTESTS'].split(',') if c.strip()]
+        self.scrape_interval_minutes = float(config['SCRAPE_INTERVAL_MINUTES'])
+        self.write_sidecar = config['WRITE_SIDECAR'].lower() in ('1', 'true', 'yes')
+        self.finished_contests = [c.strip() for c in config['FINISHED_CONTESTS'].split(',') if c.strip()]
+        self.load_jobs(config['JOBS_FILE'])
+
+        self.api_enabled = config['API_ENABLED'].lower() in ('1', 'true', 'yes')
+        self.api_host = config['API_HOST']
+        self.api_port = int(config['API_PORT'])
+
+        self.history = HistoryStore(config['HISTORY_DB']) \
+            if config['HISTORY_ENABLED'].lower() in ('1', 'true', 'yes') else None
+        self.metrics = Metrics('scraper', config['METRICS_FILE'], config['PROMETHEUS_DIR'],
+                               enabled=config['METRICS_ENABLED'].lower() in ('1', 'true', 'yes'))
+
+        # Shared fetch engine (pooled connections, bounded concurrency, page cache)
+        self.page_cache = PageCache(self.cache_dir) if self.enable_cache else None
+        self.fetcher = LeaderboardFetcher(
+            self.base_url, self.user_agent, self.request_timeout,
+            self.offset_limit, self.max_offset, self.concurrency,
+            cache=self.page_cache, finished_contests=self.finished_contests,
+            requests_per_second=self.requests_per_second, max_retries=self.max_retries,
+            backoff_base=self.backoff_base, backoff_max=self.backoff_max,
+            resume_window_minutes=self.resume_window_minutes,
+            contest_settings={job.contest: {'page_size': job.page_size, 'concurrency': job.concurrency}
+                              for job in self.jobs},
+            contest_workers=self.contest_workers if self.pipeline_contests else 1)
+        if not self.page_cache and any(job.frozen for job in self.jobs):
+            print("Warning: ENABLE_CACHE is off, so frozen contests are fetched again on every run")
+        # Whether each contest's pages changed since the last run
+        # Ranked boards generated by the last generate_sheets call, for in-process consumers
+        self.last_results = {}
+        # Worker processes for workbook writing (EXCEL_PROCESSES), started on first use
+        self.excel_pool = None
+        self.pending_sheets = []
 
 
+    def load_jobs(self, jobs_file):
+        """Contest jobs from the jobs file, or one job per CONTESTS entry with the .env settings"""
+        env_settings = {'refresh_minutes': self.scrape_interval_minutes, 'page_size': self.offset_limit,
+                        'concurrency': self.concurrency, 'frozen': False}
+        try:
+            jobs = load_jobs(jobs_file, env_settings)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Warning: Could not read jobs file {jobs_file}: {e} - using CONTESTS from .env")
+            jobs = None
+        if jobs is None:
+            jobs = [ContestJob(contest, **dict(env_settings, frozen=contest in self.finished_contests))
+                    for contest in self.contest_ids]
+        self.jobs = jobs
+        self.contest_ids = [job.contest for job in jobs]
+        self.finished_contests = list(dict.fromkeys(
+            self.finished_contests + [job.contest for job in jobs if job.frozen]))
 
     def generateExcelSheet(self, name, df):
         """Generate Excel sheet with formatting"""
-        # Sort the DataFrame
-        if name == 'TotalHackerrankLeaderBoard' or name == 'CombinedLeaderboard':
-            sort_cols = ['Total Score', 'Time'] if 'Time' in df.columns else ['Total Score']
-            sort_order = [False, True] if 'Time' in df.columns else [False]
-            df = df.sort_values(by=sort_cols, ascending=sort_order)
-        else:
-            sort_cols = ['Score', 'Time'] if 'Time' in df.columns else ['Score']
-            sort_order = [False, True] if 'Time' in df.columns else [False]
-            df = df.sort_values(by=sort_cols, ascending=sort_order)
+        df = self.prepare_board(name, df)
+        filepath = Path(f'Leaderboards/{name}.xlsx')
+        timings = self.write_board_files(filepath, df, self.excel_writer, self.write_sidecar)
+        self.finish_board(name, df, timings)
+        return df
+
+    def queue_excel_sheet(self, name, df):
+        """Generate an Excel sheet, on the workbook process pool when EXCEL_PROCESSES is set"""
+        if self.excel_processes <= 0:
+            self.generateExcelSheet(name, df)
+            return
+        if self.excel_pool is None:
+            self.excel_pool = ProcessPoolExecutor(max_workers=self.excel_processes)
+        df = self.prepare_board(name, df)
+        filepath = Path(f'Leaderboards/{name}.xlsx')
+        # The DataFrame is pickled to the worker as-is; its numeric blocks
+        # travel as raw buffers rather than per-row objects
+        future = self.excel_pool.submit(self.write_board_files, filepath, df, self.excel_writer, self.write_sidecar)
+        self.pending_sheets.append((name, df, future))
 
-        # Add rank after sorting
-        df.insert(0, 'Rank', range(1, len(df) + 1))
+    def wait_for_excel_sheets(self):
+        """Wait for workbooks still being written on the process pool"""
+        pending, self.pending_sheets = self.pending_sheets, []
+        for name, df, future in pending:
+            try:
+                self.finish_board(name, df, future.result())
+            except Exception as e:
+                print(f"❌ Error writing Leaderboards/{name}.xlsx: {e}")
+
+    def finish_board(self, name, df, timings):
+        """Record a written board"""
+        excel_seconds, sidecar_seconds = timings
+        self.metrics.record('excel_write', board=name, writer=self.excel_writer, rows=len(df),
+                            seconds=round(excel_seconds, 6))
+        if sidecar_seconds is not None:
+            self.metrics.record('sidecar_write', board=name, rows=len(df), seconds=round(sidecar_seconds, 6))
+        self.last_results[name] = df
+        print(f"✓ Generated: Leaderboards/{name}.xlsx")
+
+    def prepare_board(self, name, df):
+        """Sort a board, number its ranks and drop the raw time column"""
+        # Boards cut with top_k arrive already ranked
+        if 'Rank' not in df.columns:
+            df = rank_board(df, self.score_column(df), method=self.rank_ties)
 
         # Remove raw 'Time' column from Excel output, keep 'Time (hh:mm:ss)'
         if 'Time' in df.columns and 'Time (hh:mm:ss)' in df.columns:
             df = df.drop(columns=['Time'])
+        return df
 
-        # Create Excel file
-        filepath = Path(f'Leaderboards/{name}.xlsx')
-        with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, sheet_name='Sheet1')
-            self.apply_excel_formatting(writer.sheets['Sheet1'], df)
-        
-        print(f"✓ Generated: {filepath}")
+    @staticmethod
+    def score_column(df):
+        """Combined boards rank on Total Score, contest boards on Score"""
+        return 'Total Score' if 'Total Score' in df.columns else 'Score'
 
-    def apply_excel_formatting(self, worksheet, df):
-        """Apply formatting to Excel worksheet"""
-        # Define styles
-        styles = {
-            'header': {
-                'font': Font(name='Arial', size=18, bold=True),
-                'fill': PatternFill(start_color='00ADEAEA', end_color='00ADEAEA', fill_type='solid'),
-            },
-            'body': {
-                'font': Font(name='Arial', size=14, bold=True),
-                'fill': PatternFill(start_color='00C7ECEC', end_color='00C7ECEC', fill_type='solid'),
-            },
-            'common': {
-                'alignment': Alignment(horizontal='center', vertical='center'),
-                'border': Border(bottom=Side(style='medium'))
+    @classmethod
+    def write_board_files(cls, filepath, df, excel_writer, write_sidecar):
+        """Write a prepared board's workbook and CSV sidecar; returns (excel seconds, sidecar seconds or None)
+
+        Takes only plain arguments, so it can run in a worker process.
+        """
+        started = time.perf_counter()
+        if excel_writer == 'fast':
+            cls.write_fast_excel(filepath, df)
+        else:
+            import pandas as pd
+            with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
+                df.to_excel(writer, index=False, sheet_name='Sheet1')
+                cls.apply_excel_formatting(writer.sheets['Sheet1'], df)
+        excel_seconds = time.perf_counter() - started
+
+        # Machine-readable copy for the uploader; the xlsx is for people
+        sidecar_seconds = None
+        if write_sidecar:
+            started = time.perf_counter()
+            df.to_csv(filepath.with_suffix('.csv'), index=False)
+            sidecar_seconds = time.perf_counter() - started
+        return excel_seconds, sidecar_seconds
+
+    @classmethod
+    def excel_styles(cls):
+        """Cell styles shared by both Excel writers"""
+        if cls.EXCEL_STYLES is None:
+            from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+            cls.EXCEL_STYLES = {
+                'header': {
+                    'font': Font(name='Arial', size=18, bold=True),
+                    'fill': PatternFill(start_color='00ADEAEA', end_color='00ADEAEA', fill_type='solid'),
+                },
+                'body': {
+                    'font': Font(name='Arial', size=14, bold=True),
+                    'fill': PatternFill(start_color='00C7ECEC', end_color='00C7ECEC', fill_type='solid'),
+                },
+                'common': {
+                    'alignment': Alignment(horizontal='center', vertical='center'),
+                    'border': Border(bottom=Side(style='medium'))
+                }
             }
-        }
+        return cls.EXCEL_STYLES
+
+    @classmethod
+    def apply_excel_formatting(cls, worksheet, df):
+        """Apply formatting to Excel worksheet"""
+        styles = cls.excel_styles()
 
         # Set column widths
         worksheet.column_dimensions['A'].width = 12  # Rank column
@@ -109,13 +297,86 @@ class HackerRankLeaderboardCLI:
         for col_num, value in enumerate(df.columns.values):
             cell = worksheet.cell(row=1, column=col_num + 1)
             cell.value = value
-            self.apply_cell_style(cell, styles['header'], styles['common'])
+            cls.apply_cell_style(cell, styles['header'], styles['common'])
 
         for row_num, row in enumerate(df.values, start=2):
             for col_num, value in enumerate(row, start=1):
                 cell = worksheet.cell(row=row_num, column=col_num)
                 cell.value = value
-                self.apply_cell_style(cell, styles['body'], styles['common'])
+                cls.apply_cell_style(cell, styles['body'], styles['common'])
+
+    @classmethod
+    def write_fast_excel(cls, filepath, df):
+        """Write a formatted sheet in one streaming pass (write-only workbook, shared named styles)"""
+        cls.write_excel_rows(filepath, list(df.columns), cls.iter_excel_rows(df))
+
+    @classmethod
+    def iter_excel_rows(cls, df):
+        """Rows of a board as Python values with None for missing cells, EXCEL_CHUNK_ROWS at a time
+
+        Only one slice is ever held as objects, not a full object copy of the board.
+        """
+        for start in range(0, len(df), cls.EXCEL_CHUNK_ROWS):
+            chunk = df.iloc[start:start + cls.EXCEL_CHUNK_ROWS]
+            chunk = chunk.astype(object).where(chunk.notna(), None)
+            yield from chunk.itertuples(index=False, name=None)
+
+    @classmethod
+    def write_excel_rows(cls, filepath, columns, rows):
+        """Write an iterable of rows to a formatted write-only workbook
+
+        Rows beyond Excel's per-sheet limit continue on Sheet2, Sheet3, ...
+        each with its own header row.
+        """
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import NamedStyle
+        from openpyxl.utils import get_column_letter
+
+        styles = cls.excel_styles()
+        wb = Workbook(write_only=True)
+        for kind in ('header', 'body'):
+            style = NamedStyle(name=f'leaderboard_{kind}')
+            for attr, value in {**styles[kind], **styles['common']}.items():
+                setattr(style, attr, value)
+            wb.add_named_style(style)
+
+        def new_sheet(number):
+            worksheet = wb.create_sheet(f'Sheet{number}')
+            worksheet.column_dimensions['A'].width = 12  # Rank column
+            for col_num in range(2, len(columns) + 1):
+                worksheet.column_dimensions[get_column_letter(col_num)].width = 35
+            # One default height instead of a row_dimensions entry per row
+            worksheet.sheet_format.defaultRowHeight = 25
+            worksheet.sheet_format.customHeight = True
+
+            # A write-only sheet serialises each row as soon as it is appended,
+            # so one styled cell per column is reused for every row
+            header = styled_cells(worksheet, 'leaderboard_header')
+            for cell, value in zip(header, columns):
+                cell.value = value
+            worksheet.append(header)
+            return worksheet, styled_cells(worksheet, 'leaderboard_body')
+
+        def styled_cells(worksheet, style_name):
+            cells = [WriteOnlyCell(worksheet) for _ in columns]
+            for cell in cells:
+                cell.style = style_name
+            return cells
+
+        sheet_number = 1
+        worksheet, body = new_sheet(sheet_number)
+        sheet_rows = 1
+        for row in rows:
+            if sheet_rows >= cls.EXCEL_MAX_ROWS:
+                sheet_number += 1
+                worksheet, body = new_sheet(sheet_number)
+                sheet_rows = 1
+            for cell, value in zip(body, row):
+                cell.value = value
+            worksheet.append(body)
+            sheet_rows += 1
+        wb.save(filepath)
 
     @staticmethod
     def apply_cell_style(cell, specific_style, common_style):
@@ -124,65 +385,117 @@ class HackerRankLeaderboardCLI:
             for attr, value in style_dict.items():
                 setattr(cell, attr, value)
 
-    def fetch_hackerrank_data(self, tracker_name):
-        """Fetch data from HackerRank API"""
-        import datetime
-        data = []
-        headers = {"User-agent": self.user_agent}
-
+    def fetch_hackerrank_data(self, tracker_name, cached_only=False):
+        """Fetch data from HackerRank API, or only from the page cache when cached_only is set"""
         print(f"  Fetching data for: {tracker_name}")
-        
-        for offset in range(0, self.max_offset, self.offset_limit):
-            url = f'https://www.hackerrank.com/rest/contests/{tracker_name}/leaderboard?offset={offset}&limit={self.offset_limit}'
-            try:
-                response = requests.get(url, headers=headers, timeout=self.request_timeout)
-                response.raise_for_status()
-                json_data = response.json()
-
-                if not json_data.get('models'):
-                    break
-
-                for item in json_data['models']:
-                    # Convert time_taken (seconds) to hh:mm:ss
-                    time_taken = item.get('time_taken', None)
-                    if time_taken is not None:
-                        try:
-                            time_taken = int(time_taken)
-                            time_str = str(datetime.timedelta(seconds=time_taken))
-                        except Exception:
-                            time_str = ''
-                    else:
-                        time_str = ''
-                    data.append({
-                        'Name': item['hacker'],
-                        'Score': item['score'],
-                        'Time': time_taken if time_taken is not None else float('inf'),  # for sorting
-                        'Time (hh:mm:ss)': time_str
-                    })
-
-                print(f"    Fetched {len(data)} entries so far...")
-
-            except requests.RequestException as e:
-                print(f"  ❌ Error fetching data for {tracker_name}: {str(e)}")
-                return None
-
-        print(f"  ✓ Total entries fetched: {len(data)}")
-        if data:
-            df = pd.DataFrame(data)
-            return df
-        else:
+
+        try:
+            result = self.fetcher.fetch_pages(tracker_name, cached_only=cached_only)
+        except requests.RequestException as e:
+            print(f"  ❌ Error fetching data for {tracker_name}: {str(e)}")
+            self.metrics.record('contest_fetch_failed', contest=tracker_name, error=type(e).__name__)
+            if self.page_cache:
+                print(f"    Pages fetched so far are checkpointed; the next run resumes from them")
             return None
+        if result.from_cache:
+            reason = 'Frozen contest' if tracker_name in self.finished_contests else 'Not due for a refresh'
+            print(f"    {reason} - loaded {len(result.pages)} page(s) from cache")
+        else:
+            print(f"    Fetched {result.stats.summary(len(result.pages))}{'' if result.changed else ' - unchanged'}")
+        if result.truncated:
+            print(f"    ⚠️ Stopped at MAX_OFFSET={self.max_offset} - {tracker_name} may have more participants "
+                  f"(raise MAX_OFFSET, set it to 0 for no limit, or use STREAMING=true)")
+
+        parse_started = time.perf_counter()
+        df = self.pages_to_frame(result.pages)
+        stats = result.stats
+        self.metrics.record('contest_fetch', contest=tracker_name, seconds=round(stats.elapsed, 6),
+                            parse_seconds=round(time.perf_counter() - parse_started, 6),
+                            pages=len(result.pages), rows=len(df), bytes=stats.bytes,
+                            requests=stats.requests, retries=stats.retries,
+                            changed=result.changed, from_cache=result.from_cache, truncated=result.truncated)
+        print(f"  ✓ Total entries fetched: {len(df)}")
+        return df if len(df) else None
+
+    @classmethod
+    def pages_to_frame(cls, pages):
+        """Parse leaderboard pages straight into typed columns
+
+        Rows are collected into compact arrays instead of one dict per hacker;
+        missing times stay missing (nullable Int64) rather than float('inf'),
+        and 'Time (hh:mm:ss)' is formatted in one vectorized pass at the end.
+        """
+        import numpy as np
+        import pandas as pd
 
-    def generate_sheets(self, tracker_names):
-        """Generate Excel sheets for given contest IDs"""
+        names = []
+        scores = array('d')
+        times = array('q')
+        time_missing = bytearray()
+
+        for models in pages:
+            for item in models:
+                names.append(item['hacker'])
+                scores.append(float(item['score']))
+                try:
+                    times.append(int(item['time_taken']))
+                    time_missing.append(0)
+                except (KeyError, TypeError, ValueError):
+                    times.append(0)
+                    time_missing.append(1)
+
+        time_col = pd.arrays.IntegerArray(
+            np.array(times, dtype=np.int64), np.frombuffer(time_missing, dtype=np.bool_).copy())
+        df = pd.DataFrame({
+            'Name': pd.Categorical(names),
+            'Score': np.array(scores, dtype=np.float64),
+            'Time': time_col,  # for sorting
+        })
+        df['Time (hh:mm:ss)'] = cls.format_duration(df['Time'])
+        return df
+
+    def iter_contest_data(self, tracker_names, refresh=None):
+        """Yield (tracker_name, df) in order, fetching ahead on a worker pool when pipelined"""
+        if not self.pipeline_contests:
+            for tracker_name in tracker_names:
+                yield tracker_name, self.fetch_hackerrank_data(tracker_name, self.cached_only(tracker_name, refresh))
+            return
+
+        # Fetches run ahead in the pool while the caller builds and writes
+        # the workbook for the contest it was handed last
+        with ThreadPoolExecutor(max_workers=self.contest_workers) as executor:
+            futures = [executor.submit(self.fetch_hackerrank_data, name, self.cached_only(name, refresh))
+                       for name in tracker_names]
+            try:
+                for tracker_name, future in zip(tracker_names, futures):
+                    yield tracker_name, future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    @staticmethod
+    def cached_only(tracker_name, refresh):
+        """Whether a contest left out of this run's refresh list is served from the page cache"""
+        return refresh is not None and tracker_name not in refresh
+
+    def generate_sheets(self, tracker_names, refresh=None):
+        """Generate Excel sheets for given contest IDs
+
+        refresh lists the contests to fetch from HackerRank; the others are
+        served from the page cache when it has them (None refreshes all).
+        """
+        if self.streaming:
+            return self.generate_sheets_streaming(tracker_names, refresh)
         print(f"\nGenerating sheets for {len(tracker_names)} contest(s)...")
         
-        all_participants = {}
+        run_started = time.perf_counter()
+        self.last_results = {}
+        contest_frames = {}
+        fingerprints = {}
         
-        for idx, tracker_name in enumerate(tracker_names, 1):
+        for idx, (tracker_name, df) in enumerate(self.iter_contest_data(tracker_names, refresh), 1):
             print(f"\n[{idx}/{len(tracker_names)}] Processing: {tracker_name}")
             
-            df = self.fetch_hackerrank_data(tracker_name)
             if df is None:
                 continue
 
@@ -190,36 +503,303 @@ class HackerRankLeaderboardCLI:
                 print(f"  ⚠️ Warning: {tracker_name} returned no data")
                 continue
 
-            # Update all_participants dictionary
-            for _, row in df.iterrows():
-                if row['Name'] not in all_participants:
-                    all_participants[row['Name']] = {contest: 0 for contest in tracker_names}
-                all_participants[row['Name']][tracker_name] = row['Score']
-
-            self.generateExcelSheet(tracker_name, df)
+            contest_frames[tracker_name] = df
+            fingerprints[tracker_name] = self.frame_fingerprint(df) if self.page_cache else None
+            if self.is_unchanged(tracker_name, fingerprints[tracker_name]):
+                print(f"  ⏭️ No changes since last run - keeping Leaderboards/{tracker_name}.xlsx")
+            else:
+                self.queue_excel_sheet(tracker_name, df)
 
         # Generate total leaderboard
-        if all_participants:
-            print("\nGenerating combined leaderboard...")
-            self.generate_total_leaderboard(all_participants, tracker_names)
+        if contest_frames:
+            combined_state = {'contests': list(tracker_names), 'boards': fingerprints,
+                              'ranking': self.rank_ties, 'top': self.top_board_size}
+            top = [self.TOP_BOARD] if self.top_board_size > 0 else []
+            combined_boards = ['TotalHackerrankLeaderBoard'] + top
+            if (self.page_cache is not None
+                    and self.page_cache.load_state('combined') == combined_state
+                    and all(Path(f'Leaderboards/{name}.xlsx').exists() for name in combined_boards)):
+                print("\n⏭️ No contest changed - keeping the combined leaderboard")
+            else:
+                print("\nGenerating combined leaderboard...")
+                if self.page_cache:
+                    # Forget the last combined boards until the new ones are written
+                    self.page_cache.store_state('combined', None)
+                self.generate_total_leaderboard(contest_frames, tracker_names)
+            self.wait_for_excel_sheets()
+            for tracker_name in contest_frames:
+                if tracker_name in self.last_results:
+                    self.store_board_state(tracker_name, fingerprints[tracker_name])
+            # Only once every combined workbook is on disk; one that failed on
+            # the process pool is rebuilt next run
+            if self.page_cache and all(name in self.last_results for name in combined_boards):
+                self.page_cache.store_state('combined', combined_state)
+            self.record_history()
+            self.write_manifest(combined_boards + list(contest_frames))
             print("\n✅ All sheets generated successfully!")
             print(f"📁 Files saved in: {Path('Leaderboards').absolute()}")
         else:
             print("\n❌ No data was fetched. Please check your contest IDs.")
 
-    def generate_total_leaderboard(self, all_participants, tracker_names):
+        self.metrics.record('generate_sheets', seconds=round(time.perf_counter() - run_started, 6),
+                            contests=len(tracker_names), fetched=len(contest_frames),
+                            boards_written=len(self.last_results))
+        self.metrics.flush()
+
+    def generate_sheets_streaming(self, tracker_names, refresh=None):
+        """Generate every board with flat memory: pages -> sorted runs on disk -> merged ranked output
+
+        MAX_OFFSET does not apply; each contest is fetched to its last page.
+        """
+        from streaming_leaderboard import SortedRuns, iter_rows, contest_rank_key, name_key, combine_by_name
+
+        print(f"\nStreaming sheets for {len(tracker_names)} contest(s)...")
+        run_started = time.perf_counter()
+        self.last_results = {}
+        written = []
+        with tempfile.TemporaryDirectory(prefix='leaderboard-runs-') as work_dir:
+            name_runs = []
+            for contest_idx, tracker_name in enumerate(tracker_names):
+                print(f"\n[{contest_idx + 1}/{len(tracker_names)}] Streaming: {tracker_name}")
+                contest_runs = SortedRuns(work_dir, contest_rank_key, self.stream_run_size)
+                contest_names = SortedRuns(work_dir, name_key, self.stream_run_size)
+                stats = FetchStats()
+                rows = 0
+                try:
+                    pages = self.fetcher.iter_pages(tracker_name, stats,
+                                                    cached_only=self.cached_only(tracker_name, refresh))
+                    for seq, (name, score, time_taken) in enumerate(iter_rows(pages)):
+                        contest_runs.add((name, score, time_taken, seq))
+                        contest_names.add((name, (contest_idx, seq), contest_idx, score, time_taken))
+                        rows += 1
+                except requests.RequestException as e:
+                    print(f"  ❌ Error fetching data for {tracker_name}: {str(e)}")
+                    self.metrics.record('contest_fetch_failed', contest=tracker_name, error=type(e).__name__)
+                    continue
+                print(f"    Fetched {rows} row(s) in {stats.elapsed:.1f}s ({stats.requests} request(s), "
+                      f"{stats.retries} retries, {len(contest_runs.run_files)} sorted run(s) on disk)")
+                self.metrics.record('contest_fetch', contest=tracker_name, seconds=round(stats.elapsed, 6),
+                                    rows=rows, bytes=stats.bytes, requests=stats.requests,
+                                    retries=stats.retries, streaming=True)
+                if not rows:
+                    print(f"  ⚠️ Warning: {tracker_name} returned no data")
+                    continue
+
+                ranked = ((rank, name, score, self.duration_text(time_taken))
+                          for rank, (name, score, time_taken, _)
+                          in assign_ranks(contest_runs.merged(), lambda row: row[1:3], self.rank_ties))
+                self.write_streamed_board(tracker_name, ['Rank', 'Name', 'Score', 'Time (hh:mm:ss)'], ranked)
+                # Streamed boards keep no fingerprint, so the next in-memory run rebuilds them
+                self.store_board_state(tracker_name, None)
+                # The name runs wait on disk until every contest is in, so
+                # the last partial buffer must not stay in memory meanwhile
+                contest_names.spill()
+                name_runs.append(contest_names)
+                written.append(tracker_name)
+
+            if written:
+                print("\nGenerating combined leaderboard...")
+                if self.page_cache:
+                    # Streamed combined boards keep no state, so the next in-memory run rebuilds them
+                    self.page_cache.store_state('combined', None)
+                with self.metrics.timer('merge', contests=len(written), streaming=True):
+                    combined = combine_by_name(name_runs, len(tracker_names), work_dir, self.stream_run_size)
+                ranked = ((rank, name, *scores, total, self.duration_text(time_taken))
+                          for rank, (name, scores, total, time_taken, _)
+                          in assign_ranks(combined.merged(), lambda row: row[2:4], self.rank_ties))
+                columns = ['Rank', 'Name'] + list(tracker_names) + ['Total Score', 'Time (hh:mm:ss)']
+                top_rows = []
+                if self.top_board_size > 0:
+                    ranked = self.collect_top_rows(ranked, top_rows)
+                self.write_streamed_board('TotalHackerrankLeaderBoard', columns, ranked)
+                boards = ['TotalHackerrankLeaderBoard'] + written
+                if top_rows:
+                    self.write_streamed_board(self.TOP_BOARD, columns, iter(top_rows))
+                    boards.insert(1, self.TOP_BOARD)
+                self.write_manifest(boards)
+                print("\n✅ All sheets generated successfully!")
+                print(f"📁 Files saved in: {Path('Leaderboards').absolute()}")
+            else:
+                print("\n❌ No data was fetched. Please check your contest IDs.")
+
+        self.metrics.record('generate_sheets', seconds=round(time.perf_counter() - run_started, 6),
+                            contests=len(tracker_names), fetched=len(written),
+                            boards_written=len(written) + bool(written), streaming=True)
+        self.metrics.flush()
+
+    def collect_top_rows(self, ranked, top_rows):
+        """Pass ranked combined rows through, keeping the first TOP_BOARD_SIZE (plus ties) in top_rows
+
+        Unique ranks share no rank, so they keep exactly TOP_BOARD_SIZE rows.
+        """
+        keep_ties = self.rank_ties != 'unique'
+        for position, row in enumerate(ranked, 1):
+            # Total score and time text are the last two columns
+            if position <= self.top_board_size or (keep_ties and top_rows and row[-2:] == top_rows[-1][-2:]
+                                                   and len(top_rows) == position - 1):
+                top_rows.append(row)
+            yield row
+
+    def write_streamed_board(self, name, columns, rows):
+        """Write ranked rows to the CSV and the workbook in a single pass"""
+        import csv
+
+        filepath = Path(f'Leaderboards/{name}.xlsx')
+        sidecar = filepath.with_suffix('.csv')
+        count = 0
+        with self.metrics.timer('excel_write', board=name, writer='streaming') as fields:
+            with open(sidecar, 'w', newline='') as f:
+                writer = csv.writer(f, lineterminator='\n')
+                writer.writerow(columns)
+
+                def tee():
+                    nonlocal count
+                    for row in rows:
+                        writer.writerow(row)
+                        count += 1
+                        yield row
+
+                self.write_excel_rows(filepath, columns, tee())
+            fields['rows'] = count
+        # The uploader only trusts a sidecar at least as new as the workbook
+        os.utime(sidecar)
+        print(f"✓ Generated: {filepath} ({count} rows)")
+
+    @staticmethod
+    def duration_text(seconds):
+        """One duration as format_duration prints it"""
+        return '' if seconds is None else str(timedelta(seconds=seconds))
+
+    def record_history(self):
+        """Append the boards written by this run to the history store"""
+        if self.history is None or not self.last_results:
+            return
+        taken_at = datetime.now()
+        try:
+            with self.metrics.timer('history_ingest', boards=len(self.last_results)) as fields:
+                # The top board repeats the head of the combined board
+                fields['changed'] = sum(self.history.ingest_board(name, df, taken_at)
+                                        for name, df in self.last_results.items() if name != self.TOP_BOARD)
+            print(f"📜 History updated: {fields['changed']} changed standing(s)")
+        except Exception as e:
+            print(f"Warning: Could not update history: {e}")
+
+    def write_manifest(self, boards):
+        """List this run's boards in Leaderboards/manifest.json so the uploader publishes each of them"""
+        manifest = Path('Leaderboards/manifest.json')
+        tmp_file = manifest.with_name(manifest.name + '.tmp')
+        with open(tmp_file, 'w') as f:
+            json.dump({'generated': datetime.now().isoformat(timespec='seconds'), 'boards': boards}, f, indent=2)
+        os.replace(tmp_file, manifest)
+
+    @staticmethod
+    def frame_fingerprint(df):
+        """Digest of a contest's rows in order, recorded with the board written from them"""
+        import hashlib
+        import pandas as pd
+
+        digest = hashlib.blake2b(digest_size=12)
+        digest.update(json.dumps(list(df.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+        return digest.hexdigest()
+
+    def board_state(self, fingerprint):
+        """What a contest board was built from and how it was ranked"""
+        return {'ranking': self.rank_ties, 'fingerprint': fingerprint}
+
+    def store_board_state(self, tracker_name, fingerprint):
+        """Record a contest board that was written successfully"""
+        if self.page_cache is not None:
+            self.page_cache.store_state(f'board-{tracker_name}', self.board_state(fingerprint))
+
+    def is_unchanged(self, tracker_name, fingerprint):
+        """True if the last workbook written for a contest holds these rows, ranked the same way
+
+        Compared with what was written rather than with the page cache, so
+        a board whose write failed is rebuilt on the next run.
+        """
+        if self.page_cache is None or fingerprint is None:
+            return False
+        return (self.page_cache.load_state(f'board-{tracker_name}') == self.board_state(fingerprint)
+                and Path(f'Leaderboards/{tracker_name}.xlsx').exists())
+
+    def build_total_leaderboard(self, contest_frames, tracker_names):
+        """Merge per-contest frames into one combined leaderboard in a single columnar pass"""
+        import numpy as np
+        import pandas as pd
+
+        combined = pd.concat(
+            [df[['Name', 'Score', 'Time']].assign(Contest=name) for name, df in contest_frames.items()],
+            ignore_index=True)
+        # A repeated name inside one contest keeps its last score
+        combined = combined.drop_duplicates(subset=['Name', 'Contest'], keep='last')
+        combined['Name'] = combined['Name'].astype(object)
+
+        # Participants stay in order of first appearance
+        names = combined['Name'].drop_duplicates()
+        df_total = (combined.pivot(index='Name', columns='Contest', values='Score')
+                    .reindex(index=names, columns=tracker_names)
+                    .fillna(0))
+        if pd.api.types.is_integer_dtype(combined['Score']):
+            df_total = df_total.astype(combined['Score'].dtype)
+        df_total['Total Score'] = df_total[tracker_names].sum(axis=1)
+
+        # Total time over the contests a participant has a time for, used as tie-breaker
+        times = pd.to_numeric(combined['Time'], errors='coerce').astype('float64')
+        times = times.where(np.isfinite(times))
+        df_total['Time'] = (times.groupby(combined['Name'], sort=False).sum(min_count=1)
+                            .reindex(names).round().astype('Int64'))
+        df_total['Time (hh:mm:ss)'] = self.format_duration(df_total['Time'])
+
+        df_total = df_total.reset_index()
+        df_total.columns.name = None
+        return df_total[['Name'] + tracker_names + ['Total Score', 'Time', 'Time (hh:mm:ss)']]
+
+    @classmethod
+    def format_duration(cls, seconds):
+        """Format a Series of seconds like str(datetime.timedelta), blank where missing"""
+        import numpy as np
+        import pandas as pd
+
+        seconds = pd.to_numeric(seconds, errors='coerce').astype('float64')
+        valid = np.isfinite(seconds).to_numpy()
+        total = np.where(valid, seconds, 0).astype('int64')
+        whole_hours, rem = np.divmod(total, 3600)
+
+        # The "[D days, ]H" and ":MM:SS" parts come from lookup tables, so the
+        # only string built per row is the final text
+        unique_hours, hour_index = np.unique(whole_hours, return_inverse=True)
+        prefix_table = np.array([cls.hours_prefix(h) for h in unique_hours.tolist()], dtype=object)
+        minute_second_table = np.array([f':{m:02d}:{sec:02d}' for m in range(60) for sec in range(60)], dtype=object)
+        text = prefix_table[hour_index.reshape(-1)] + minute_second_table[rem]
+        text[~valid] = ''
+        return pd.Series(text, index=seconds.index, dtype=object)
+
+    @staticmethod
+    def hours_prefix(whole_hours):
+        """'H' or 'D day(s), H' for a whole number of hours, as str(timedelta) prints it"""
+        days, hours = divmod(whole_hours, 24)
+        if days == 0:
+            return f'{hours}'
+        return f"{days} {'day' if abs(days) == 1 else 'days'}, {hours}"
+
+    def generate_total_leaderboard(self, contest_frames, tracker_names):
         """Generate total leaderboard combining all contests"""
-        total_data = []
-        for participant, scores in all_participants.items():
-            row = {'Name': participant}
-            row.update(scores)
-            row['Total Score'] = sum(scores.values())
-            total_data.append(row)
-
-        df_total = pd.DataFrame(total_data)
-        columns = ['Name'] + tracker_names + ['Total Score']
-        df_total = df_total[columns]
-        self.generateExcelSheet('TotalHackerrankLeaderBoard', df_total)
+        with self.metrics.timer('merge', contests=len(contest_frames)):
+            df_total = self.build_total_leaderboard(contest_frames, tracker_names)
+        # With a process pool this starts while contest workbooks are still being written
+        self.queue_excel_sheet('TotalHackerrankLeaderBoard', df_total)
+        if self.top_board_size > 0:
+            with self.metrics.timer('top_board', rows=len(df_total), size=self.top_board_size):
+                df_top = top_k(df_total, self.top_board_size, 'Total Score', method=self.rank_ties)
+            self.queue_excel_sheet(self.TOP_BOARD, df_top)
+
+    def close(self):
+        """Close pooled connections and stop workbook worker processes"""
+        self.fetcher.close()
+        if self.excel_pool is not None:
+            self.excel_pool.shutdown()
+            self.excel_pool = None
 
     def run(self):
         """Main application loop"""
@@ -230,15 +810,27 @@ class HackerRankLeaderboardCLI:
         print(f"  - Search keyword: {self.search_keyword}")
         print(f"  - Request timeout: {self.request_timeout}s")
         print(f"  - Offset limit: {self.offset_limit}")
+        print(f"  - Concurrency: {self.concurrency}")
+        print(f"  - Pipelined contests: {self.pipeline_contests} ({self.contest_workers} worker(s))")
+        print(f"  - Workbook processes: {self.excel_processes or 'off'}")
+        print(f"  - Tied ranks: {self.rank_ties}")
         
-        print(f"\n📊 Processing contest: coderally-6-0-training-weeks")
-        contest_ids = ["coderally-6-0-training-weeks"]
-        self.generate_sheets(contest_ids)
+        print(f"\n📊 Processing {len(self.jobs)} contest(s):")
+        for job in self.jobs:
+            print(f"  - {job}")
+        try:
+            self.generate_sheets(self.contest_ids)
+        finally:
+            self.close()
         
         print(f"\n✅ Process completed! Check the Leaderboards folder for results.")
 
 
 if __name__ == "__main__":
+    if '--profile-startup' in sys.argv:
+        from startup_profile import profile_startup
+        profile_startup('scraper', STARTED, HackerRankLeaderboardCLI, ['numpy', 'pandas', 'openpyxl'])
+        sys.exit(0)
     try:
         app = HackerRankLeaderboardCLI()
         app.run()
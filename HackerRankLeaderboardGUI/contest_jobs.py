@@ -0,0 +1,114 @@
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Settings a job can set for its contests; a contest entry overrides its
+# group, which overrides "defaults", which overrides the .env values
+JOB_SETTINGS = {
+    'refresh_minutes': float,
+    'page_size': int,
+    'concurrency': int,
+    'frozen': bool,
+}
+
+
+class ContestJob:
+    """Refresh settings of one contest"""
+
+    def __init__(self, contest, group=None, refresh_minutes=30, page_size=100, concurrency=4, frozen=False):
+        self.contest = contest
+        self.group = group
+        self.refresh_minutes = refresh_minutes
+        self.page_size = page_size
+        self.concurrency = concurrency
+        # Finished contests are fetched once and then always served from the page cache
+        self.frozen = frozen
+
+    def __repr__(self):
+        state = 'frozen' if self.frozen else f'every {self.refresh_minutes:g} min'
+        return f'{self.contest} ({state}, {self.page_size}/page, {self.concurrency} in flight)'
+
+
+def job_settings(entry, inherited, where):
+    """inherited settings updated with the ones in a jobs.json entry"""
+    settings = dict(inherited)
+    for key, value in entry.items():
+        if key in ('name', 'id', 'contests'):
+            continue
+        if key not in JOB_SETTINGS:
+            print(f"Warning: Unknown setting '{key}' in {where} of the jobs file")
+            continue
+        if JOB_SETTINGS[key] is bool:
+            settings[key] = value if isinstance(value, bool) else str(value).lower() in ('1', 'true', 'yes')
+        else:
+            settings[key] = JOB_SETTINGS[key](value)
+    return settings
+
+
+def load_jobs(jobs_file, defaults):
+    """Contest jobs listed in a jobs.json file, in file order; None if there is no such file
+
+    {
+      "defaults": {"refresh_minutes": 30, "page_size": 100, "concurrency": 4},
+      "groups": [
+        {"name": "weekly", "refresh_minutes": 10,
+         "contests": ["week-1", {"id": "week-2", "frozen": true}]}
+      ],
+      "contests": ["practice", {"id": "finals", "refresh_minutes": 2, "concurrency": 8}]
+    }
+
+    defaults holds the .env values used where the file sets nothing.
+    """
+    jobs_file = Path(jobs_file)
+    if not jobs_file.exists():
+        return None
+    with open(jobs_file, 'r') as f:
+        data = json.load(f)
+
+    base = job_settings(data.get('defaults', {}), defaults, 'defaults')
+    sections = [(group.get('name'), group) for group in data.get('groups', [])]
+    sections.append((None, {'contests': data.get('contests', [])}))
+
+    jobs = {}
+    for group_name, group in sections:
+        where = f"group '{group_name}'" if group_name else 'contests'
+        group_settings = job_settings(group, base, where)
+        for entry in group.get('contests', []):
+            if isinstance(entry, str):
+                entry = {'id': entry}
+            contest = entry['id']
+            if contest in jobs:
+                print(f"Warning: {contest} is listed more than once in the jobs file, keeping the first entry")
+                continue
+            jobs[contest] = ContestJob(contest, group_name, **job_settings(entry, group_settings, contest))
+    return list(jobs.values())
+
+
+class JobSchedule:
+    """When each contest is next due for a refresh
+
+    Live contests come due on their own refresh interval; frozen contests
+    never come due, so after their first fetch they cost no requests.
+    """
+
+    def __init__(self, jobs):
+        self.jobs = {job.contest: job for job in jobs}
+        # A contest with no entry has not been refreshed yet and is due now
+        self.next_due = {}
+
+    def due(self, now=None):
+        """Live contests whose refresh is due"""
+        now = now or datetime.now()
+        return [contest for contest, job in self.jobs.items()
+                if not job.frozen and self.next_due.get(contest, now) <= now]
+
+    def mark_refreshed(self, contests, now=None):
+        now = now or datetime.now()
+        for contest in contests:
+            self.next_due[contest] = now + timedelta(minutes=self.jobs[contest].refresh_minutes)
+
+    def next_run(self, now=None):
+        """Earliest time any live contest comes due, or None when every contest is frozen"""
+        now = now or datetime.now()
+        times = [self.next_due.get(contest, now) for contest, job in self.jobs.items() if not job.frozen]
+        return min(times) if times else None
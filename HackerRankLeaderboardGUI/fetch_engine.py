@@ -0,0 +1,391 @@
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class FetchResult:
+    """Pages fetched for one contest, in offset order"""
+
+    def __init__(self, pages, changed=True, from_cache=False, stats=None, truncated=False):
+        self.pages = pages
+        self.changed = changed        # False when every page matches the cached copy
+        self.from_cache = from_cache  # True when no request was made at all
+        self.stats = stats or FetchStats()
+        self.truncated = truncated    # True when max_offset stopped the fetch before the last page
+
+
+class FetchStats:
+    """Request, retry and byte counters for one contest (shared by its worker threads)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.elapsed = 0.0
+        self.requests = 0
+        self.retries = 0
+        self.bytes = 0
+        self.resumed_pages = 0
+        self.truncated = False  # set by iter_pages when max_offset ended the fetch
+
+    def record_request(self, response=None, retried=False):
+        with self.lock:
+            self.requests += 1
+            if retried:
+                self.retries += 1
+            if response is not None:
+                self.bytes += len(response.content)
+
+    def finish(self):
+        self.elapsed = time.monotonic() - self.started
+
+    def summary(self, pages):
+        """One-line throughput and retry report"""
+        rate = pages / self.elapsed if self.elapsed > 0 else 0.0
+        text = (f"{pages} page(s) in {self.elapsed:.1f}s ({rate:.1f} pages/s, "
+                f"{self.bytes / 1024:.0f} KB, {self.requests} request(s), {self.retries} retries")
+        if self.resumed_pages:
+            text += f", {self.resumed_pages} resumed from checkpoint"
+        return text + ")"
+
+
+class TokenBucket:
+    """Thread-safe token bucket that adapts its rate to 429 responses
+
+    The rate is halved on every rate-limit answer and creeps back up to the
+    configured rate as requests succeed.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.capacity = capacity or max(1.0, self.rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        if self.max_rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_for = (1 - self.tokens) / self.rate
+            time.sleep(wait_for)
+
+    def penalize(self):
+        """Back off after a rate-limit answer"""
+        with self.lock:
+            self.rate = max(self.max_rate / 16, self.rate / 2)
+            self.tokens = min(self.tokens, 0)
+
+    def reward(self):
+        """Recover towards the configured rate after a success"""
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+class LeaderboardFetcher:
+    """Fetch HackerRank leaderboard pages over a pooled HTTP session"""
+
+    def __init__(self, base_url, user_agent, timeout, page_size, max_offset, concurrency,
+                 cache=None, finished_contests=(), requests_per_second=0, max_retries=5,
+                 backoff_base=1.0, backoff_max=60.0, resume_window_minutes=60, contest_settings=None,
+                 contest_workers=1):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.page_size = page_size
+        self.max_offset = max_offset
+        self.concurrency = max(1, concurrency)
+        # {contest: {'page_size': ..., 'concurrency': ...}} overriding the two above per contest
+        self.contest_settings = contest_settings or {}
+        self.cache = cache
+        self.finished_contests = set(finished_contests)
+        self.rate_limiter = TokenBucket(requests_per_second)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.resume_window = resume_window_minutes * 60
+
+        # One session for every page, so connections (and TLS) are reused
+        self.session = requests.Session()
+        self.session.headers.update({"User-agent": user_agent})
+        # Up to contest_workers contests fetch at once, each with its own pages in flight
+        pool_size = max([self.concurrency] + [self.concurrency_for(c) for c in self.contest_settings])
+        pool_size *= max(1, contest_workers)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def page_size_for(self, tracker_name):
+        return self.contest_settings.get(tracker_name, {}).get('page_size', self.page_size)
+
+    def concurrency_for(self, tracker_name):
+        """Pages of one contest allowed in flight at once"""
+        return max(1, self.contest_settings.get(tracker_name, {}).get('concurrency', self.concurrency))
+
+    @staticmethod
+    def page_offsets(max_offset, page_size):
+        """Page offsets up to max_offset, or without end when it is 0"""
+        if max_offset <= 0:
+            return itertools.count(0, page_size)
+        return iter(range(0, max_offset, page_size))
+
+    def page_url(self, tracker_name, offset):
+        """Build the leaderboard URL for one page"""
+        return (f'{self.base_url}/rest/contests/{tracker_name}/leaderboard'
+                f'?offset={offset}&limit={self.page_size_for(tracker_name)}')
+
+    @staticmethod
+    def retry_after_seconds(response):
+        """Seconds requested by a Retry-After header (delta or HTTP date), or None"""
+        value = response.headers.get('Retry-After') if response is not None else None
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+    def backoff_delay(self, attempt):
+        """Exponential backoff with full jitter"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def get_with_retries(self, url, headers, stats):
+        """GET with rate limiting, retrying timeouts, connection errors, 429 and 5xx"""
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire()
+            retryable = attempt < self.max_retries
+            try:
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                stats.record_request(retried=retryable)
+                if not retryable:
+                    raise
+                time.sleep(self.backoff_delay(attempt))
+                continue
+
+            stats.record_request(response, retried=retryable and response.status_code in RETRY_STATUS_CODES)
+            if response.status_code not in RETRY_STATUS_CODES:
+                self.rate_limiter.reward()
+                return response
+            if response.status_code == 429:
+                self.rate_limiter.penalize()
+            if not retryable:
+                response.raise_for_status()
+
+            delay = self.retry_after_seconds(response)
+            time.sleep(min(self.backoff_max, delay) if delay is not None else self.backoff_delay(attempt))
+
+    def fetch_page(self, tracker_name, offset, stats=None):
+        """Fetch a single page and return (models, changed)
+
+        With a cache, the request is conditional on the cached ETag/Last-Modified
+        and a 304 answer is served from the cached copy.
+        """
+        stats = stats or FetchStats()
+        page_size = self.page_size_for(tracker_name)
+        cached = self.cache.load_page(tracker_name, offset, page_size) if self.cache else None
+        headers = {}
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        response = self.get_with_retries(self.page_url(tracker_name, offset), headers, stats)
+        if response.status_code == 304 and cached:
+            return cached['models'], False
+        response.raise_for_status()
+        models = response.json().get('models') or []
+
+        if not self.cache:
+            return models, True
+        changed = self.cache.store_page(
+            tracker_name, offset, page_size, models,
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified'))
+        return models, changed
+
+    def fetch_pages(self, tracker_name, cached_only=False):
+        """Fetch all pages with a bounded number in flight, as a FetchResult in offset order
+
+        Stops scheduling new pages once any page comes back short or empty.
+        Finished contests with a complete cache, and any contest when
+        cached_only is set, are served without any request.
+        With a cache, every finished page is checkpointed, so a run that failed
+        part-way resumes from the pages it already has.
+        Raises requests.RequestException if a needed page still fails after retries.
+        """
+        stats = FetchStats()
+        page_size = self.page_size_for(tracker_name)
+        concurrency = self.concurrency_for(tracker_name)
+        if self.cache and (cached_only or tracker_name in self.finished_contests):
+            pages = self.cache.cached_pages(tracker_name, page_size)
+            if pages is not None:
+                stats.finish()
+                return FetchResult(pages, changed=False, from_cache=True, stats=stats)
+
+        # {offset: changed} for pages already fetched by an interrupted run
+        progress = self.load_checkpoint(tracker_name)
+        checkpoint_lock = threading.Lock()
+
+        offsets = self.page_offsets(self.max_offset, page_size)
+        results = {}
+        last_offset = None  # offset of the first short page seen
+
+        def record(offset, models, changed):
+            nonlocal last_offset
+            results[offset] = (models, changed)
+            if len(models) < page_size and (last_offset is None or offset < last_offset):
+                last_offset = offset
+
+        def checkpoint(offset, changed):
+            if self.cache:
+                with checkpoint_lock:
+                    progress['pages'][str(offset)] = changed
+                    self.cache.store_progress(tracker_name, progress)
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            in_flight = {}
+
+            def submit_next():
+                for offset in offsets:
+                    if last_offset is not None and offset > last_offset:
+                        return False
+                    resumed = self.cache.load_page(tracker_name, offset, page_size) \
+                        if str(offset) in progress['pages'] else None
+                    if resumed is not None:
+                        stats.resumed_pages += 1
+                        record(offset, resumed['models'], progress['pages'][str(offset)])
+                        continue
+                    in_flight[executor.submit(self.fetch_page, tracker_name, offset, stats)] = offset
+                    return True
+                return False
+
+            for _ in range(concurrency):
+                if not submit_next():
+                    break
+
+            try:
+                while in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        offset = in_flight.pop(future)
+                        models, changed = future.result()
+                        record(offset, models, changed)
+                        checkpoint(offset, changed)
+                        submit_next()
+            except Exception:
+                for future in in_flight:
+                    future.cancel()
+                # Pages already being fetched still finish; keep the ones that
+                # succeeded so the next run does not fetch them again
+                for future, offset in in_flight.items():
+                    if future.cancelled() or future.exception() is not None:
+                        continue
+                    checkpoint(offset, future.result()[1])
+                raise
+            finally:
+                stats.finish()
+
+        offsets = [offset for offset in sorted(results) if last_offset is None or offset <= last_offset]
+        pages = [results[offset][0] for offset in offsets]
+        changed = any(results[offset][1] for offset in offsets)
+        # Every page up to the cap came back full, so there may be more
+        truncated = last_offset is None and bool(offsets)
+
+        if self.cache:
+            # A page appearing or disappearing is a change too
+            changed = changed or self.cache.load_meta(tracker_name).get('offsets') != offsets
+            self.cache.store_meta(tracker_name, page_size, offsets)
+            self.cache.clear_progress(tracker_name)
+        return FetchResult(pages, changed=changed, stats=stats, truncated=truncated)
+
+    def iter_pages(self, tracker_name, stats, max_offset=0, cached_only=False):
+        """Yield pages in offset order until the leaderboard ends, holding only the pages in flight
+
+        Up to `concurrency` pages are requested ahead of the one being consumed.
+        With max_offset 0 there is no cap; stats.truncated tells whether a cap
+        stopped the fetch. Cached pages are replayed one at a time like in
+        fetch_pages. Raises requests.RequestException like fetch_pages.
+        """
+        page_size = self.page_size_for(tracker_name)
+        concurrency = self.concurrency_for(tracker_name)
+        if self.cache and (cached_only or tracker_name in self.finished_contests):
+            cached_offsets = self.cache.complete_offsets(tracker_name, page_size)
+            if cached_offsets is not None:
+                for offset in cached_offsets:
+                    models = self.cache.load_page(tracker_name, offset, page_size)['models']
+                    if models:
+                        yield models
+                stats.finish()
+                return
+
+        offsets = self.page_offsets(max_offset, page_size)
+        fetched = []
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            in_flight = {}
+
+            def submit_next():
+                offset = next(offsets, None)
+                if offset is not None:
+                    in_flight[offset] = executor.submit(self.fetch_page, tracker_name, offset, stats)
+
+            for _ in range(concurrency):
+                submit_next()
+            try:
+                expected = 0
+                while expected in in_flight:
+                    models, _ = in_flight.pop(expected).result()
+                    fetched.append(expected)
+                    if models:
+                        yield models
+                    if len(models) < page_size:
+                        break
+                    expected += page_size
+                    submit_next()
+                else:
+                    stats.truncated = bool(fetched)
+            finally:
+                for future in in_flight.values():
+                    future.cancel()
+                stats.finish()
+
+        if self.cache:
+            # Keep the cache consistent with what fetch_pages would have stored
+            self.cache.store_meta(tracker_name, page_size, fetched)
+
+    def load_checkpoint(self, tracker_name):
+        """Progress of an interrupted run that is recent enough to resume, else a fresh record"""
+        page_size = self.page_size_for(tracker_name)
+        fresh = {'limit': page_size, 'started': time.time(), 'pages': {}}
+        if not self.cache:
+            return fresh
+        progress = self.cache.load_progress(tracker_name)
+        if (progress is None or progress.get('limit') != page_size
+                or time.time() - progress.get('started', 0) > self.resume_window):
+            return fresh
+        return progress
+
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
@@ -1,30 +1,39 @@
+import time
+STARTED = time.perf_counter()
+
 import os
+import sys
 import json
-import time
-import pandas as pd
 from datetime import datetime, timedelta
 from pathlib import Path
-import requests
-from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+from metrics import Metrics
+from upload_queue import UploadQueue
+
+# gspread, oauth2client, pandas and requests are imported on the code paths
+# that use them, so a run that finds it is not yet time to upload stays cheap
 
 class GoogleSheetsUploader:
+    COMBINED_BOARD = 'TotalHackerrankLeaderBoard'
+
     def __init__(self):
         self.SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
         self.SERVICE_ACCOUNT_FILE = 'service_account.json'  # You'll need to create this
         self.SPREADSHEET_ID = None  # Will be set from config
         self.WORKSHEET_NAME = 'Leaderboard'
         self.last_upload_file = 'last_upload.json'
-        self.pending_uploads_file = 'pending_uploads.json'
+        self.pending_uploads_file = 'pending_uploads.json'  # legacy queue, migrated on start
+        self.upload_queue_file = 'upload_queue.db'
+        self.shadow_file = 'sheet_shadow.json'
+        self.manifest_file = 'Leaderboards/manifest.json'
         self.config_file = 'uploader_config.json'
         
         self.load_config()
-        self.setup_google_sheets()
+        self.upload_queue = UploadQueue(self.upload_queue_file)
+        migrated = self.upload_queue.migrate_json(self.pending_uploads_file, self.worksheet_title)
+        if migrated:
+            print(f"📦 Moved {migrated} pending upload(s) from {self.pending_uploads_file} to {self.upload_queue_file}")
+        # gspread client, connected on the first upload and kept afterwards
+        self.gc = None
         
     def load_config(self):
         """Load configuration from JSON file"""
@@ -32,23 +41,39 @@ class GoogleSheetsUploader:
             'SPREADSHEET_ID': '',  # User needs to set this
             'WORKSHEET_NAME': 'Leaderboard',
             'UPLOAD_INTERVAL_HOURS': 2,
-            'MAX_OFFLINE_HOURS': 6
+            'MAX_OFFLINE_HOURS': 6,
+            'UPLOAD_MODE': 'diff',
+            'UPLOAD_CONTEST_SHEETS': True
         }
+        # Defaults first, so a missing or unreadable config file still leaves every setting in place
+        self.apply_config(default_config, default_config)
+        metrics_config = {'METRICS_ENABLED': True, 'METRICS_FILE': 'metrics.jsonl', 'PROMETHEUS_DIR': ''}
         
         if Path(self.config_file).exists():
             try:
                 with open(self.config_file, 'r') as f:
                     config = json.load(f)
-                    self.SPREADSHEET_ID = config.get('SPREADSHEET_ID', '')
-                    self.WORKSHEET_NAME = config.get('WORKSHEET_NAME', 'Leaderboard')
-                    self.upload_interval = config.get('UPLOAD_INTERVAL_HOURS', 2)
-                    self.max_offline_hours = config.get('MAX_OFFLINE_HOURS', 6)
+                    self.apply_config(config, default_config)
+                    metrics_config.update({k: config[k] for k in metrics_config if k in config})
             except Exception as e:
                 print(f"Error loading config: {e}")
                 self.create_default_config(default_config)
         else:
             self.create_default_config(default_config)
+        
+        self.metrics = Metrics('uploader', metrics_config['METRICS_FILE'], metrics_config['PROMETHEUS_DIR'],
+                               enabled=bool(metrics_config['METRICS_ENABLED']))
     
+    def apply_config(self, config, defaults):
+        """Set the upload settings from a config dict, taking defaults for missing keys"""
+        config = {**defaults, **config}
+        self.SPREADSHEET_ID = config['SPREADSHEET_ID']
+        self.WORKSHEET_NAME = config['WORKSHEET_NAME']
+        self.upload_interval = config['UPLOAD_INTERVAL_HOURS']
+        self.max_offline_hours = config['MAX_OFFLINE_HOURS']
+        self.upload_mode = config['UPLOAD_MODE']
+        self.upload_contest_sheets = bool(config['UPLOAD_CONTEST_SHEETS'])
+
     def create_default_config(self, config):
         """Create default configuration file"""
         with open(self.config_file, 'w') as f:
@@ -59,6 +84,9 @@ class GoogleSheetsUploader:
     def setup_google_sheets(self):
         """Setup Google Sheets connection"""
         try:
+            import gspread
+            from oauth2client.service_account import ServiceAccountCredentials
+
             if not Path(self.SERVICE_ACCOUNT_FILE).exists():
                 print(f"Service account file not found: {self.SERVICE_ACCOUNT_FILE}")
                 print("Please create a service account JSON file from Google Cloud Console")
@@ -79,6 +107,7 @@ class GoogleSheetsUploader:
     
     def check_internet_connection(self):
         """Check if internet connection is available"""
+        import requests
         try:
             response = requests.get('https://www.google.com', timeout=5)
             return response.status_code == 200
@@ -102,6 +131,13 @@ class GoogleSheetsUploader:
         with open(self.last_upload_file, 'w') as f:
             json.dump(data, f)
     
+    def next_upload_time(self):
+        """When the next upload is due (now if there has never been one)"""
+        last_upload = self.get_last_upload_time()
+        if last_upload is None:
+            return datetime.now()
+        return last_upload + timedelta(hours=self.upload_interval)
+    
     def should_upload(self):
         """Check if it's time to upload based on interval"""
         last_upload = self.get_last_upload_time()
@@ -112,7 +148,7 @@ class GoogleSheetsUploader:
         time_since_last = datetime.now() - last_upload
         hours_passed = time_since_last.total_seconds() / 3600
         
-        if time_since_last >= timedelta(hours=self.upload_interval):
+        if datetime.now() >= self.next_upload_time():
             print(f"📤 {hours_passed:.1f} hours passed - time to upload")
             return True
         else:
@@ -121,66 +157,52 @@ class GoogleSheetsUploader:
             return False
     
     def add_to_pending_uploads(self, file_path):
-        """Add file to pending uploads queue"""
-        pending = []
-        if Path(self.pending_uploads_file).exists():
-            try:
-                with open(self.pending_uploads_file, 'r') as f:
-                    pending = json.load(f)
-            except:
-                pending = []
-        
-        # Add new file with timestamp
-        pending.append({
-            'file_path': str(file_path),
-            'timestamp': datetime.now().isoformat()
-        })
-        
-        # Keep only recent files (within max offline period)
-        cutoff_time = datetime.now() - timedelta(hours=self.max_offline_hours)
-        pending = [p for p in pending if datetime.fromisoformat(p['timestamp']) > cutoff_time]
-        
-        with open(self.pending_uploads_file, 'w') as f:
-            json.dump(pending, f, indent=2)
+        """Queue a leaderboard file for its worksheet, replacing an older entry for the same worksheet"""
+        self.upload_queue.add(self.worksheet_title(Path(file_path).stem), file_path)
     
     def get_pending_uploads(self):
-        """Get list of pending uploads"""
-        if Path(self.pending_uploads_file).exists():
-            try:
-                with open(self.pending_uploads_file, 'r') as f:
-                    return json.load(f)
-            except:
-                return []
-        return []
+        """Get list of pending uploads, one per target worksheet"""
+        return self.upload_queue.pending()
     
-    def clear_pending_uploads(self):
-        """Clear pending uploads after successful upload"""
-        if Path(self.pending_uploads_file).exists():
-            os.remove(self.pending_uploads_file)
+    def load_leaderboard(self, excel_file_path):
+        """Load a leaderboard, preferring the CSV sidecar the scraper writes next to the xlsx"""
+        import pandas as pd
+
+        excel_file_path = Path(excel_file_path)
+        sidecar = excel_file_path.with_suffix('.csv')
+        if sidecar.exists() and (not excel_file_path.exists()
+                                 or sidecar.stat().st_mtime >= excel_file_path.stat().st_mtime):
+            df = pd.read_csv(sidecar, dtype={'Name': str}, keep_default_na=False)
+            print(f"📊 CSV sidecar loaded: {len(df)} rows, {len(df.columns)} columns")
+        else:
+            df = pd.read_excel(excel_file_path)
+            print(f"📊 Excel file loaded: {len(df)} rows, {len(df.columns)} columns")
+        return df
+    
+    @staticmethod
+    def dataframe_to_csv_data(df):
+        """Convert a DataFrame to headers and rows of strings in one vectorized pass"""
+        import pandas as pd
+
+        headers = df.columns.tolist()
+        
+        # Whole-number float columns read like Excel does, as integers
+        values = df.copy()
+        for column in values.columns:
+            if pd.api.types.is_float_dtype(values[column]):
+                present = values[column].dropna()
+                if (present == present.round()).all():
+                    values[column] = values[column].astype('Int64')
+        
+        data_rows = values.astype(str).where(values.notna(), "").values.tolist()
+        return headers, data_rows
     
     def excel_to_csv_data(self, excel_file_path):
         """Convert Excel file to CSV-like data format"""
         try:
-            # Read Excel file
-            df = pd.read_excel(excel_file_path)
-            print(f"📊 Excel file loaded: {len(df)} rows, {len(df.columns)} columns")
-            
-            # Convert to simple CSV-like format
-            # Get headers
-            headers = df.columns.tolist()
-            
-            # Get data rows and convert everything to strings
-            data_rows = []
-            for index, row in df.iterrows():
-                csv_row = []
-                for value in row:
-                    if pd.isna(value):
-                        csv_row.append("")
-                    elif isinstance(value, (int, float)):
-                        csv_row.append(str(value))
-                    else:
-                        csv_row.append(str(value))
-                data_rows.append(csv_row)
+            with self.metrics.timer('load_leaderboard', source=Path(excel_file_path).name):
+                df = self.load_leaderboard(excel_file_path)
+                headers, data_rows = self.dataframe_to_csv_data(df)
             
             print(f"📋 Converted to CSV format: {len(headers)} columns, {len(data_rows)} data rows")
             print(f"📊 Headers: {', '.join(headers)}")
@@ -193,94 +215,238 @@ class GoogleSheetsUploader:
 
     def upload_csv_to_google_sheets(self, excel_file_path):
         """Upload Excel data as CSV format to Google Sheets"""
+        # Convert Excel to CSV format
+        headers, data_rows = self.excel_to_csv_data(excel_file_path)
+        if headers is None or data_rows is None:
+            return False
+        return self.upload_boards([(self.WORKSHEET_NAME, headers, data_rows)])
+    
+    def upload_boards(self, boards):
+        """Upload (worksheet title, headers, string rows) boards, each to its own worksheet
+        
+        Worksheets are created, resized and cleared in one spreadsheets.batchUpdate,
+        and the changed ranges of every worksheet go out in one values.batchUpdate.
+        """
+        if not self.SPREADSHEET_ID:
+            print("Google Sheets ID not configured!")
+            return False
+        if self.gc is None and not self.setup_google_sheets():
+            return False
+        from gspread.utils import absolute_range_name, rowcol_to_a1
+        
+        upload_started = time.perf_counter()
         try:
-            if not self.SPREADSHEET_ID:
-                print("Google Sheets ID not configured!")
-                return False
-                
-            # Convert Excel to CSV format
-            headers, data_rows = self.excel_to_csv_data(excel_file_path)
-            if headers is None or data_rows is None:
-                return False
-            
-            # Open the Google Sheet
-            sheet = self.gc.open_by_key(self.SPREADSHEET_ID)
-            
-            # Try to get existing worksheet or create new one
-            try:
-                worksheet = sheet.worksheet(self.WORKSHEET_NAME)
-                worksheet.clear()  # Clear existing data
-                print(f"📋 Cleared existing worksheet: {self.WORKSHEET_NAME}")
-            except gspread.WorksheetNotFound:
-                worksheet = sheet.add_worksheet(title=self.WORKSHEET_NAME, rows=1000, cols=26)
-                print(f"📋 Created new worksheet: {self.WORKSHEET_NAME}")
-            
-            # Upload in simple CSV style
-            print("📤 Uploading data to Google Sheets...")
-            
-            # Row 1: Timestamp
+            # Row 1: Timestamp, Row 2: Headers, Row 3 onwards: Data
             timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            worksheet.update(values=[[f"Last Updated: {timestamp}"]], range_name='A1')
             
-            # Row 2: Headers
-            worksheet.update(values=[headers], range_name='A2')
+            # Open the Google Sheet once for every board
+            sheet = self.sheets_call('open_by_key', self.gc.open_by_key, self.SPREADSHEET_ID)
+            existing = {worksheet.title: worksheet for worksheet in self.sheets_call('worksheets', sheet.worksheets)}
+            shadow = self.load_shadow()
             
-            # Row 3 onwards: Data
-            if data_rows:
-                # Upload all data at once
-                start_row = 3
-                end_row = start_row + len(data_rows) - 1
-                range_name = f'A{start_row}:Z{end_row}'
+            sheet_requests = []
+            value_ranges = []
+            uploaded = []
+            for title, headers, data_rows in boards:
+                grid = [[f"Last Updated: {timestamp}"], headers] + data_rows
+                width = max(len(row) for row in grid)
+                shadow_key = f"{self.SPREADSHEET_ID}/{title}"
+                previous = shadow.get(shadow_key) if self.upload_mode == 'diff' else None
                 
-                worksheet.update(values=data_rows, range_name=range_name)
+                worksheet = existing.get(title)
+                if worksheet is None:
+                    sheet_requests.append({'addSheet': {'properties': {
+                        'title': title,
+                        'gridProperties': {'rowCount': max(1000, len(grid)), 'columnCount': max(26, width)}}}})
+                    print(f"📋 Creating new worksheet: {title}")
+                    previous = None
+                else:
+                    # Make room when the leaderboard outgrew the worksheet grid
+                    if worksheet.row_count < len(grid) or worksheet.col_count < width:
+                        sheet_requests.append({'updateSheetProperties': {
+                            'properties': {'sheetId': worksheet.id, 'gridProperties': {
+                                'rowCount': max(worksheet.row_count, len(grid)),
+                                'columnCount': max(worksheet.col_count, width)}},
+                            'fields': 'gridProperties(rowCount,columnCount)'}})
+                    if previous is None:
+                        sheet_requests.append({'updateCells': {'range': {'sheetId': worksheet.id},
+                                                               'fields': 'userEnteredValue'}})
+                        print(f"📋 Clearing existing worksheet: {title}")
+                
+                data = self.compute_sheet_delta(previous or [], grid)
+                value_ranges.extend({'range': absolute_range_name(title, entry['range']), 'values': entry['values']}
+                                    for entry in data)
+                uploaded.append((title, shadow_key, grid, width, data, previous is None))
+            
+            if sheet_requests:
+                self.sheets_call('batch_update', sheet.batch_update, {'requests': sheet_requests})
+            print(f"📤 Uploading {len(value_ranges)} range(s) across {len(uploaded)} worksheet(s) to Google Sheets...")
+            if value_ranges:
+                self.sheets_call('values_batch_update', sheet.values_batch_update,
+                                 body={'valueInputOption': 'RAW', 'data': value_ranges})
             
-            print(f"✅ Successfully uploaded {len(data_rows)} rows to Google Sheets")
-            print(f"📊 Data range: A1:Z{len(data_rows)+2}")
+            for title, shadow_key, grid, width, data, full in uploaded:
+                self.metrics.record('upload', worksheet=title, rows=len(grid) - 2, ranges=len(data),
+                                    cells=sum(len(entry['values']) * len(entry['values'][0]) for entry in data),
+                                    mode='full' if full else 'diff')
+                shadow[shadow_key] = grid
+                print(f"✅ {title}: {len(grid) - 2} rows (A1:{rowcol_to_a1(len(grid), width)})")
+            self.save_shadow(shadow)
+            self.metrics.record('upload_batch', worksheets=len(uploaded), ranges=len(value_ranges),
+                                seconds=round(time.perf_counter() - upload_started, 6))
+            
+            print(f"✅ Successfully uploaded {len(uploaded)} worksheet(s) to Google Sheets")
             return True
             
         except Exception as e:
             print(f"❌ Error uploading CSV to Google Sheets: {e}")
+            self.metrics.record('upload_failed', worksheets=len(boards), error=type(e).__name__)
             import traceback
             traceback.print_exc()
             return False
+        finally:
+            self.metrics.flush()
+    
+    def sheets_call(self, call, func, *args, **kwargs):
+        """Run one Google Sheets API call, recording its latency"""
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.metrics.record('sheets_api_call', call=call, seconds=round(time.perf_counter() - started, 6))
     
-    def process_uploads(self):
-        """Process uploads - check if it's time and upload if online"""
+    def load_shadow(self):
+        """Load the local copy of what was last uploaded to each worksheet"""
+        if Path(self.shadow_file).exists():
+            try:
+                with open(self.shadow_file, 'r') as f:
+                    return json.load(f)
+            except:
+                return {}
+        return {}
+    
+    def save_shadow(self, shadow):
+        """Save the local copy of uploaded worksheets"""
+        tmp_file = f"{self.shadow_file}.tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(shadow, f)
+        os.replace(tmp_file, self.shadow_file)
+    
+    @staticmethod
+    def compute_sheet_delta(old_grid, new_grid):
+        """Ranges that turn old_grid into new_grid, for Worksheet.batch_update
+        
+        Consecutive changed rows are grouped into one range. Cells that no
+        longer exist are overwritten with empty strings.
+        """
+        data = []
+        run_start = None
+        run_rows = []
+        for row_idx in range(max(len(old_grid), len(new_grid))):
+            old_row = old_grid[row_idx] if row_idx < len(old_grid) else []
+            new_row = new_grid[row_idx] if row_idx < len(new_grid) else []
+            if old_row != new_row:
+                if run_start is None:
+                    run_start = row_idx
+                # Pad so cells left over from the old row get blanked
+                run_rows.append(list(new_row) + [""] * (len(old_row) - len(new_row)))
+                continue
+            if run_start is not None:
+                data.append(GoogleSheetsUploader.delta_range(run_start, run_rows))
+                run_start, run_rows = None, []
+        if run_start is not None:
+            data.append(GoogleSheetsUploader.delta_range(run_start, run_rows))
+        return data
+    
+    @staticmethod
+    def delta_range(start_idx, rows):
+        """One batch_update entry for a block of rows starting at 0-based row start_idx"""
+        from gspread.utils import rowcol_to_a1
+
+        width = max(1, max(len(row) for row in rows))
+        values = [row + [""] * (width - len(row)) for row in rows]
+        start = rowcol_to_a1(start_idx + 1, 1)
+        end = rowcol_to_a1(start_idx + len(rows), width)
+        return {'range': f"{start}:{end}", 'values': values}
+    
+    def worksheet_title(self, board_name):
+        """Worksheet a board is published to; the combined board keeps WORKSHEET_NAME"""
+        if board_name == self.COMBINED_BOARD:
+            return self.WORKSHEET_NAME
+        return board_name[:100]  # Google Sheets' limit on sheet titles
+    
+    def board_files(self):
+        """Leaderboard files of the last scrape, combined board first"""
+        names = [self.COMBINED_BOARD]
+        if self.upload_contest_sheets and Path(self.manifest_file).exists():
+            try:
+                with open(self.manifest_file, 'r') as f:
+                    names = json.load(f)['boards']
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Warning: Could not read {self.manifest_file}: {e}")
+        files = [Path(f'Leaderboards/{name}.xlsx') for name in names]
+        return [file_path for file_path in files if file_path.exists()]
+    
+    def process_uploads(self, leaderboards=None):
+        """Process uploads - check if it's time and upload if online
+        
+        leaderboards is an optional {board name: DataFrame} handed over by the
+        scraper in the same process; boards missing from it are read from file.
+        """
         if not self.should_upload():
             print("⏰ Not time to upload yet")
             return
         
-        # Check for the main leaderboard file
-        main_file = Path('Leaderboards/TotalHackerrankLeaderBoard.xlsx')
-        if not main_file.exists():
+        # Check for the leaderboard files
+        board_files = self.board_files()
+        if not board_files:
             print("📄 No leaderboard file found to upload")
             return
         
         # Check internet connection
         if not self.check_internet_connection():
             print("🌐 No internet connection - adding to pending uploads")
-            self.add_to_pending_uploads(main_file)
+            for file_path in board_files:
+                self.add_to_pending_uploads(file_path)
             return
         
-        # Upload main file
-        if self.upload_csv_to_google_sheets(main_file):
+        # Queued worksheets go out in the same batch; one that is being
+        # uploaded now is covered by its current copy
+        self.upload_queue.compact(self.max_offline_hours)
+        files = {self.worksheet_title(file_path.stem): file_path for file_path in board_files}
+        pending = self.get_pending_uploads()
+        for item in pending:
+            files.setdefault(item['target'], Path(item['file_path']))
+        if pending:
+            print(f"📤 Processing {len(pending)} pending upload(s)...")
+        
+        boards = []
+        unreadable = []
+        for target, file_path in files.items():
+            df = (leaderboards or {}).get(file_path.stem)
+            if df is not None:
+                headers, data_rows = self.dataframe_to_csv_data(df)
+                print(f"📋 {file_path.stem} received in-process: {len(headers)} columns, {len(data_rows)} data rows")
+            else:
+                headers, data_rows = self.excel_to_csv_data(file_path)
+            if headers is not None and data_rows is not None:
+                boards.append((target, headers, data_rows))
+            else:
+                unreadable.append(target)
+        if unreadable:
+            self.upload_queue.mark_failed(unreadable, 'could not read leaderboard file')
+        
+        targets = [target for target, _, _ in boards]
+        if boards and self.upload_boards(boards):
             self.update_last_upload_time()
-            
-            # Process any pending uploads
-            pending = self.get_pending_uploads()
+            self.upload_queue.mark_done(targets)
             if pending:
-                print(f"📤 Processing {len(pending)} pending uploads...")
-                for item in pending:
-                    file_path = Path(item['file_path'])
-                    if file_path.exists():
-                        self.upload_csv_to_google_sheets(file_path)
-                
-                # Clear pending uploads after successful processing
-                self.clear_pending_uploads()
-                print("✅ All pending uploads processed")
+                print("✅ Pending uploads processed")
         else:
-            # If upload failed, add to pending
-            self.add_to_pending_uploads(main_file)
+            # If upload failed, queue this run's boards and count the attempt
+            for file_path in board_files:
+                self.add_to_pending_uploads(file_path)
+            self.upload_queue.mark_failed(targets, 'upload failed')
 
 def main():
     """Main function to run the uploader"""
@@ -296,4 +462,9 @@ def main():
     print("✅ Upload process completed")
 
 if __name__ == "__main__":
+    if '--profile-startup' in sys.argv:
+        from startup_profile import profile_startup
+        profile_startup('uploader', STARTED, GoogleSheetsUploader,
+                        ['requests', 'numpy', 'pandas', 'gspread', 'oauth2client.service_account'])
+        sys.exit(0)
     main()
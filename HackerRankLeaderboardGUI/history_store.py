@@ -0,0 +1,125 @@
+import argparse
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timedelta
+
+
+class HistoryStore:
+    """Score and rank history of every board, kept in SQLite
+
+    Each ingest compares a ranked board with the latest known standing of
+    every participant and stores only the rows that changed, together with
+    their rank delta, score delta and score velocity (points per hour since
+    the previous change). Top-mover and per-hacker queries then read a few
+    indexed rows instead of old spreadsheets.
+    """
+
+    def __init__(self, db_file='history.db'):
+        self.db_file = db_file
+
+    def connect(self):
+        conn = sqlite3.connect(self.db_file)
+        conn.row_factory = sqlite3.Row
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS standings (
+                contest     TEXT NOT NULL,
+                name        TEXT NOT NULL,
+                taken_at    TEXT NOT NULL,
+                rank        INTEGER NOT NULL,
+                score       REAL NOT NULL,
+                rank_delta  INTEGER,  -- previous rank - rank, so climbing is positive; NULL when new
+                score_delta REAL,
+                velocity    REAL      -- score_delta per hour since the previous stored standing
+            );
+            CREATE INDEX IF NOT EXISTS standings_by_time ON standings (contest, taken_at);
+            CREATE INDEX IF NOT EXISTS standings_by_name ON standings (contest, name, taken_at);
+            CREATE TABLE IF NOT EXISTS latest (
+                contest  TEXT NOT NULL,
+                name     TEXT NOT NULL,
+                rank     INTEGER NOT NULL,
+                score    REAL NOT NULL,
+                taken_at TEXT NOT NULL,
+                PRIMARY KEY (contest, name)
+            );
+        """)
+        return conn
+
+    def ingest(self, contest, ranked_rows, taken_at=None):
+        """Record one scrape of a board from (rank, name, score) rows; returns how many rows changed"""
+        taken_at = taken_at or datetime.now()
+        stamp = taken_at.isoformat(timespec='seconds')
+        with closing(self.connect()) as conn, conn:
+            latest = {row['name']: row for row in conn.execute(
+                'SELECT name, rank, score, taken_at FROM latest WHERE contest = ?', (contest,))}
+            changed = []
+            for rank, name, score in ranked_rows:
+                previous = latest.get(name)
+                if previous is None:
+                    changed.append((contest, name, stamp, rank, score, None, None, None))
+                    continue
+                if previous['rank'] == rank and previous['score'] == score:
+                    continue
+                score_delta = score - previous['score']
+                hours = (taken_at - datetime.fromisoformat(previous['taken_at'])).total_seconds() / 3600
+                velocity = score_delta / hours if hours > 0 else None
+                changed.append((contest, name, stamp, rank, score, previous['rank'] - rank, score_delta, velocity))
+
+            conn.executemany('INSERT INTO standings VALUES (?, ?, ?, ?, ?, ?, ?, ?)', changed)
+            conn.executemany('INSERT OR REPLACE INTO latest VALUES (?, ?, ?, ?, ?)',
+                             [(row[0], row[1], row[3], row[4], stamp) for row in changed])
+        return len(changed)
+
+    def ingest_board(self, contest, df, taken_at=None):
+        """Record a ranked board DataFrame (Rank, Name and Score or Total Score columns)"""
+        score_column = 'Total Score' if 'Total Score' in df.columns else 'Score'
+        rows = zip(df['Rank'].tolist(), df['Name'].astype(str).tolist(), df[score_column].astype(float).tolist())
+        return self.ingest(contest, rows, taken_at)
+
+    def top_movers(self, contest, since, limit=10):
+        """Participants who climbed the most ranks since a datetime"""
+        with closing(self.connect()) as conn:
+            rows = conn.execute("""
+                SELECT name, SUM(rank_delta) AS climbed, SUM(score_delta) AS gained, MAX(velocity) AS best_velocity
+                FROM standings
+                WHERE contest = ? AND taken_at >= ? AND rank_delta IS NOT NULL
+                GROUP BY name
+                ORDER BY climbed DESC, gained DESC
+                LIMIT ?""", (contest, since.isoformat(timespec='seconds'), limit)).fetchall()
+        return [dict(row) for row in rows]
+
+    def hacker_history(self, contest, name):
+        """Every stored change of one participant's standing, oldest first"""
+        with closing(self.connect()) as conn:
+            rows = conn.execute("""
+                SELECT taken_at, rank, score, rank_delta, score_delta, velocity
+                FROM standings WHERE contest = ? AND name = ? ORDER BY taken_at""", (contest, name)).fetchall()
+        return [dict(row) for row in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query the leaderboard history recorded by the scraper')
+    parser.add_argument('--db', default='history.db')
+    parser.add_argument('--contest', default='TotalHackerrankLeaderBoard', help='contest ID or combined board name')
+    commands = parser.add_subparsers(dest='command', required=True)
+    movers = commands.add_parser('movers', help='who climbed the most')
+    movers.add_argument('--days', type=float, default=7)
+    movers.add_argument('--limit', type=int, default=10)
+    history = commands.add_parser('history', help="one hacker's rank and score over time")
+    history.add_argument('name')
+    args = parser.parse_args()
+
+    store = HistoryStore(args.db)
+    if args.command == 'movers':
+        since = datetime.now() - timedelta(days=args.days)
+        print(f"📈 Top movers in {args.contest} since {since:%Y-%m-%d %H:%M}:")
+        for position, row in enumerate(store.top_movers(args.contest, since, args.limit), 1):
+            print(f"  {position:>3}. {row['name']:<30} {row['climbed']:+6d} ranks  {row['gained']:+8.1f} points")
+    else:
+        print(f"📜 {args.name} in {args.contest}:")
+        for row in store.hacker_history(args.contest, args.name):
+            delta = 'new' if row['rank_delta'] is None else f"{row['rank_delta']:+d}"
+            print(f"  {row['taken_at']}  rank {row['rank']:>6} ({delta:>5})  score {row['score']:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
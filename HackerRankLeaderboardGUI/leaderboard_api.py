@@ -0,0 +1,338 @@
+import time
+STARTED = time.perf_counter()
+
+import argparse
+import hashlib
+import json
+import sys
+import threading
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qs, unquote
+
+from ranking import IncrementalRanker
+
+# pandas is imported where boards are indexed, so serving requests never waits for it
+
+
+def duration_seconds(text):
+    """Seconds in a 'Time (hh:mm:ss)' cell ('[D day(s), ]H:MM:SS'), or None when blank"""
+    if not text:
+        return None
+    days = 0
+    if ',' in text:
+        day_text, text = text.split(',', 1)
+        days = int(day_text.split()[0])
+    hours, minutes, seconds = (int(part) for part in text.strip().split(':'))
+    return days * 86400 + hours * 3600 + minutes * 60 + seconds
+
+
+class BoardIndex:
+    """One board's rows, ranked by an IncrementalRanker and looked up by position, rank or hacker name
+
+    The ranker of the previous snapshot is copied and synced, so a scrape
+    that moved a few participants re-ranks them with a few list moves
+    instead of sorting the board again. A repeated name keeps its last row.
+    """
+
+    def __init__(self, name, df, generated, source_mtime=None, previous=None, rank_ties='competition'):
+        import pandas as pd
+
+        self.name = name
+        self.generated = generated
+        self.rank_ties = rank_ties
+        # Modification time of the file the board was read from; None when handed over in memory
+        self.source_mtime = source_mtime
+        self.columns = [str(column) for column in df.columns]
+        score_column = 'Total Score' if 'Total Score' in self.columns else 'Score'
+
+        # Rows are converted to plain JSON values once, here, not per request
+        self.rows = {str(row['Name']): row for row in json.loads(df.to_json(orient='records', force_ascii=False))}
+        # HackerRank usernames are case-insensitive
+        self.by_name = {hacker.lower(): hacker for hacker in self.rows}
+
+        self.ranker = previous.ranker.copy() if previous is not None else IncrementalRanker()
+        self.moved = self.ranker.sync(self.standings(score_column))
+
+        digest = hashlib.blake2b(digest_size=12)
+        digest.update(json.dumps(self.columns).encode())
+        digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+        # Same content, same tag: an unchanged board keeps answering 304 across scrapes
+        self.etag = digest.hexdigest()
+
+    def standings(self, score_column):
+        """(hacker, score, time, tie order) in board order
+
+        Rows tied on score and time keep the order the board lists them in,
+        as rank_board left them, so every rank agrees with the board's file.
+        """
+        seen = {}
+        for hacker, row in self.rows.items():
+            standing = (float(row[score_column]), duration_seconds(row.get('Time (hh:mm:ss)')))
+            tie_order = seen[standing] = seen.get(standing, -1) + 1
+            yield hacker, *standing, tie_order
+
+    def page(self, offset, limit):
+        return [dict(self.rows[hacker], Rank=rank)
+                for rank, hacker, _, _ in self.ranker.page(offset, limit, self.rank_ties)]
+
+    def offset_of_rank(self, rank):
+        """Position of the first row ranked rank or lower"""
+        return self.ranker.offset_of_rank(rank, self.rank_ties)
+
+    def find(self, hacker):
+        hacker = self.by_name.get(hacker.lower())
+        if hacker is None:
+            return None
+        return dict(self.rows[hacker], Rank=self.ranker.rank(hacker, self.rank_ties))
+
+
+class LeaderboardIndex:
+    """Snapshot of every board; never modified, only replaced as a whole"""
+
+    def __init__(self, boards, generated):
+        self.boards = boards  # name -> BoardIndex, in manifest order
+        self.generated = generated
+        digest = hashlib.blake2b(digest_size=12)
+        for board in boards.values():
+            digest.update(f'{board.name}:{board.etag};'.encode())
+        self.etag = digest.hexdigest()
+
+
+class LeaderboardAPI:
+    """Read-only JSON API over the latest combined and per-contest boards
+
+    Every request reads self.index once and answers from that snapshot.
+    refresh() builds a complete new index on the side and swaps it in with
+    a single assignment, so a scrape or reload never blocks a reader or
+    shows it half-updated boards.
+    """
+
+    MAX_PAGE_SIZE = 1000
+    DEFAULT_PAGE_SIZE = 100
+
+    def __init__(self, leaderboards_dir='Leaderboards', metrics=None, rank_ties='competition'):
+        self.leaderboards_dir = Path(leaderboards_dir)
+        self.metrics = metrics
+        self.rank_ties = rank_ties
+        self.index = LeaderboardIndex({}, None)
+        # Refreshes are serialised; readers never take this lock
+        self.refresh_lock = threading.Lock()
+
+    def read_manifest(self):
+        try:
+            with open(self.leaderboards_dir / 'manifest.json', 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def read_board(self, name):
+        """(DataFrame, mtime) of a board on disk, from its CSV sidecar when that is current"""
+        import pandas as pd
+
+        workbook = self.leaderboards_dir / f'{name}.xlsx'
+        sidecar = workbook.with_suffix('.csv')
+        try:
+            if sidecar.exists() and (not workbook.exists() or sidecar.stat().st_mtime >= workbook.stat().st_mtime):
+                return pd.read_csv(sidecar, dtype={'Name': str}, keep_default_na=False), sidecar.stat().st_mtime
+            if workbook.exists():
+                # Boards past Excel's row limit continue on Sheet2, Sheet3, ...
+                sheets = pd.read_excel(workbook, sheet_name=None, dtype={'Name': str}, keep_default_na=False)
+                return pd.concat(sheets.values(), ignore_index=True), workbook.stat().st_mtime
+        except Exception as e:
+            print(f"Warning: Could not read board {name}: {e}")
+        return None, None
+
+    def refresh(self, boards=None):
+        """Index the boards of the latest scrape and swap them in
+
+        boards are ranked DataFrames handed over in memory (the scraper's
+        last_results); any other board in the manifest is read from disk
+        unless the index already holds the same file.
+        """
+        boards = dict(boards or {})
+        with self.refresh_lock:
+            started = time.perf_counter()
+            current = self.index.boards
+            manifest = self.read_manifest()
+            names = manifest['boards'] if manifest else list(boards)
+            generated = manifest['generated'] if manifest else datetime.now().isoformat(timespec='seconds')
+
+            indexed = {}
+            read = 0
+            moved = 0
+            for name in names:
+                if name in boards:
+                    indexed[name] = BoardIndex(name, boards[name], generated,
+                                               previous=current.get(name), rank_ties=self.rank_ties)
+                    moved += indexed[name].moved
+                    continue
+                previous = current.get(name)
+                if previous is not None and previous.source_mtime is None:
+                    # Handed over in memory earlier and skipped as unchanged since
+                    indexed[name] = previous
+                    continue
+                path = self.leaderboards_dir / f'{name}.csv'
+                if not path.exists():
+                    path = path.with_suffix('.xlsx')
+                mtime = path.stat().st_mtime if path.exists() else None
+                if previous is not None and previous.source_mtime == mtime:
+                    indexed[name] = previous
+                    continue
+                df, mtime = self.read_board(name)
+                if df is not None:
+                    indexed[name] = BoardIndex(name, df, generated, mtime, previous=previous, rank_ties=self.rank_ties)
+                    moved += indexed[name].moved
+                    read += 1
+
+            self.index = LeaderboardIndex(indexed, generated)
+            if self.metrics is not None:
+                self.metrics.record('api_refresh', seconds=round(time.perf_counter() - started, 6),
+                                    boards=len(indexed), rows=sum(len(b.rows) for b in indexed.values()),
+                                    from_memory=len(boards), from_disk=read, moved=moved)
+        return self.index
+
+    def watch(self, poll_seconds, stop_event):
+        """Refresh whenever the scraper rewrites the manifest, until stop_event is set"""
+        manifest = self.leaderboards_dir / 'manifest.json'
+        last_seen = manifest.stat().st_mtime if manifest.exists() else None
+        while not stop_event.wait(poll_seconds):
+            seen = manifest.stat().st_mtime if manifest.exists() else None
+            if seen != last_seen:
+                last_seen = seen
+                index = self.refresh()
+                print(f"🔄 [{datetime.now():%H:%M:%S}] Reloaded {len(index.boards)} board(s)")
+                if self.metrics is not None:
+                    self.metrics.flush()
+
+    def respond(self, path, query):
+        """(status, payload, etag) for one GET request"""
+        index = self.index
+        parts = [unquote(part) for part in path.split('/') if part]
+
+        if not parts or parts == ['boards']:
+            return 200, {
+                'generated': index.generated,
+                'boards': [{'name': board.name, 'rows': len(board.rows), 'etag': board.etag}
+                           for board in index.boards.values()],
+            }, index.etag
+
+        if parts == ['health']:
+            return 200, {'status': 'ok', 'generated': index.generated, 'boards': len(index.boards)}, None
+
+        if parts[0] == 'hackers' and len(parts) == 2:
+            standings = {name: row for name, board in index.boards.items()
+                         if (row := board.find(parts[1])) is not None}
+            if not standings:
+                return 404, {'error': f'Hacker {parts[1]} is not on any board'}, None
+            return 200, {'hacker': parts[1], 'generated': index.generated, 'boards': standings}, index.etag
+
+        if parts[0] != 'boards' or len(parts) not in (2, 4) or (len(parts) == 4 and parts[2] != 'hackers'):
+            return 404, {'error': f'Unknown path {path}'}, None
+
+        board = index.boards.get(parts[1])
+        if board is None:
+            return 404, {'error': f'Unknown board {parts[1]}'}, None
+
+        if len(parts) == 4:
+            row = board.find(parts[3])
+            if row is None:
+                return 404, {'error': f'Hacker {parts[3]} is not on {board.name}'}, None
+            return 200, {'board': board.name, 'generated': board.generated, 'hacker': row}, board.etag
+
+        try:
+            limit = min(max(int(query.get('limit', [self.DEFAULT_PAGE_SIZE])[0]), 1), self.MAX_PAGE_SIZE)
+            if 'rank' in query:
+                offset = board.offset_of_rank(int(query['rank'][0]))
+            else:
+                offset = max(int(query.get('offset', [0])[0]), 0)
+        except ValueError:
+            return 400, {'error': 'offset, limit and rank must be integers'}, None
+        next_offset = offset + limit if offset + limit < len(board.rows) else None
+        return 200, {
+            'board': board.name,
+            'generated': board.generated,
+            'total': len(board.rows),
+            'offset': offset,
+            'limit': limit,
+            'next_offset': next_offset,
+            'columns': board.columns,
+            'rows': board.page(offset, limit),
+        }, board.etag
+
+    def start(self, host, port):
+        """Serve on a background thread; returns the server (call shutdown() to stop it)"""
+        server = ThreadingHTTPServer((host, port), LeaderboardRequestHandler)
+        server.daemon_threads = True
+        server.api = self
+        threading.Thread(target=server.serve_forever, name='leaderboard-api', daemon=True).start()
+        return server
+
+
+class LeaderboardRequestHandler(BaseHTTPRequestHandler):
+    server_version = 'LeaderboardAPI/1.0'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        status, payload, etag = self.server.api.respond(url.path, parse_qs(url.query))
+        quoted = f'"{etag}"' if etag else None
+
+        if status == 200 and quoted:
+            # Clients revalidate with If-None-Match and get an empty 304 while the board is unchanged
+            requested = {tag.strip() for tag in self.headers.get('If-None-Match', '').split(',')}
+            if quoted in requested or f'W/{quoted}' in requested or '*' in requested:
+                self.send_response(304)
+                self.send_header('ETag', quoted)
+                self.send_header('Cache-Control', 'no-cache')
+                self.end_headers()
+                return
+
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if quoted:
+            self.send_header('ETag', quoted)
+            self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # One line per request would drown the scraper's progress output
+        pass
+
+
+def main():
+    from cli_scraper_no_dotenv import HackerRankLeaderboardCLI
+
+    scraper = HackerRankLeaderboardCLI()
+    parser = argparse.ArgumentParser(description='Serve the latest leaderboards as JSON')
+    parser.add_argument('--host', default=scraper.api_host)
+    parser.add_argument('--port', type=int, default=scraper.api_port)
+    parser.add_argument('--poll', type=float, default=5, help='seconds between checks for a new scrape')
+    args = parser.parse_args()
+
+    api = LeaderboardAPI(metrics=scraper.metrics, rank_ties=scraper.rank_ties)
+    index = api.refresh()
+    server = api.start(args.host, args.port)
+    print(f"🌐 Leaderboard API on http://{args.host}:{args.port}/boards ({len(index.boards)} board(s) loaded)")
+    print("  Reloads automatically after every scrape; Ctrl+C to stop")
+    stop_event = threading.Event()
+    try:
+        api.watch(args.poll, stop_event)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        scraper.close()
+        scraper.metrics.flush()
+        print("👋 Leaderboard API stopped")
+
+
+if __name__ == "__main__":
+    if '--profile-startup' in sys.argv:
+        from startup_profile import profile_startup
+        profile_startup('api', STARTED, LeaderboardAPI, ['numpy', 'pandas'])
+        sys.exit(0)
+    main()
@@ -0,0 +1,124 @@
+import signal
+import threading
+from datetime import datetime, timedelta
+
+from cli_scraper_no_dotenv import HackerRankLeaderboardCLI
+from contest_jobs import JobSchedule
+from google_sheets_uploader import GoogleSheetsUploader
+
+
+class LeaderboardDaemon:
+    """Resident process that scrapes and uploads on their own intervals
+
+    Each contest is refreshed on its own interval from the jobs file; a
+    scrape fetches only the contests that are due and serves the rest,
+    frozen ones included, from the page cache.
+
+    The scraper's HTTP session and the uploader's gspread client are created
+    once and stay warm between runs. With API_ENABLED the JSON API is served
+    from the same process and re-indexed after every scrape.
+    """
+
+    UPLOAD_RETRY_MINUTES = 15
+
+    def __init__(self):
+        self.scraper = HackerRankLeaderboardCLI()
+        self.uploader = GoogleSheetsUploader()
+        self.schedule = JobSchedule(self.scraper.jobs)
+        self.stop_event = threading.Event()
+        self.api = None
+        self.api_server = None
+
+    def start_api(self):
+        """Serve the boards of the previous run until the first scrape replaces them"""
+        from leaderboard_api import LeaderboardAPI
+
+        self.api = LeaderboardAPI(metrics=self.scraper.metrics, rank_ties=self.scraper.rank_ties)
+        self.api.refresh()
+        try:
+            self.api_server = self.api.start(self.scraper.api_host, self.scraper.api_port)
+        except OSError as e:
+            print(f"❌ Could not start the leaderboard API: {e}")
+            self.api = None
+            return
+        print(f"  - Leaderboard API on http://{self.scraper.api_host}:{self.scraper.api_port}/boards")
+
+    def install_signal_handlers(self):
+        """Stop after the current task on Ctrl+C / SIGTERM"""
+        def request_stop(signum, frame):
+            if self.stop_event.is_set():
+                raise KeyboardInterrupt
+            print("\n🛑 Stop requested - finishing the current task (press Ctrl+C again to force)")
+            self.stop_event.set()
+
+        signal.signal(signal.SIGINT, request_stop)
+        signal.signal(signal.SIGTERM, request_stop)
+        if hasattr(signal, 'SIGBREAK'):  # Ctrl+Break / console close on Windows
+            signal.signal(signal.SIGBREAK, request_stop)
+
+    def scrape(self):
+        """Run one scrape, fetching the contests that are due"""
+        started = datetime.now()
+        due = self.schedule.due(started)
+        print(f"\n[{started:%Y-%m-%d %H:%M:%S}] Starting scraper - refreshing {len(due)} of "
+              f"{len(self.scraper.contest_ids)} contest(s)...")
+        try:
+            self.scraper.generate_sheets(self.scraper.contest_ids, refresh=due)
+        except Exception as e:
+            print(f"❌ Error running scraper: {e}")
+        self.schedule.mark_refreshed(due, started)
+        if self.api is not None:
+            try:
+                self.api.refresh(self.scraper.last_results)
+            except Exception as e:
+                print(f"❌ Error refreshing the leaderboard API: {e}")
+
+    def upload(self):
+        """Upload the latest boards, handing over in-process the ones that were just built"""
+        print(f"\n[{datetime.now():%Y-%m-%d %H:%M:%S}] Attempting Google Sheets upload...")
+        try:
+            self.uploader.process_uploads(leaderboards=self.scraper.last_results)
+        except Exception as e:
+            print(f"❌ Error with Google Sheets upload: {e}")
+
+    def run(self):
+        """Main scheduling loop"""
+        self.install_signal_handlers()
+        print("🚀 Leaderboard daemon started")
+        live = [job for job in self.scraper.jobs if not job.frozen]
+        print(f"  - {len(live)} live contest(s), refreshed every "
+              f"{', '.join(sorted({f'{job.refresh_minutes:g}' for job in live}, key=float)) or '-'} minutes")
+        print(f"  - {len(self.scraper.jobs) - len(live)} frozen contest(s), served from the cache")
+        print(f"  - Upload every {self.uploader.upload_interval} hours")
+        if self.scraper.api_enabled:
+            self.start_api()
+
+        next_scrape = datetime.now()
+        next_upload = self.uploader.next_upload_time()
+        try:
+            while not self.stop_event.is_set():
+                if next_scrape is not None and datetime.now() >= next_scrape:
+                    self.scrape()
+                    # None once every contest is frozen: they were built once and never change
+                    next_scrape = self.schedule.next_run()
+
+                if not self.stop_event.is_set() and datetime.now() >= next_upload:
+                    self.upload()
+                    next_upload = self.uploader.next_upload_time()
+                    if next_upload <= datetime.now():
+                        # Upload failed or went to the pending queue; retry later
+                        next_upload = datetime.now() + timedelta(minutes=self.UPLOAD_RETRY_MINUTES)
+
+                wake_at = min(next_scrape or next_upload, next_upload)
+                scrape_text = f"{next_scrape:%H:%M:%S}" if next_scrape else 'never (all contests frozen)'
+                print(f"⏰ Next scrape at {scrape_text}, next upload at {next_upload:%Y-%m-%d %H:%M:%S}")
+                self.stop_event.wait(max(0.0, (wake_at - datetime.now()).total_seconds()))
+        finally:
+            if self.api_server is not None:
+                self.api_server.shutdown()
+            self.scraper.close()
+            print("👋 Leaderboard daemon stopped")
+
+
+if __name__ == "__main__":
+    LeaderboardDaemon().run()
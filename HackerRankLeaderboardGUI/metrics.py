@@ -0,0 +1,86 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+
+class Metrics:
+    """Lightweight run metrics: timed stages and counters
+
+    Events are buffered in memory and appended to a JSON-lines file on
+    flush(). Running totals can also be dumped in Prometheus text format
+    (one .prom file per component, e.g. for a node_exporter textfile
+    collector). Recording an event is a dict append under a lock, cheap
+    enough to leave on.
+    """
+
+    def __init__(self, component, jsonl_file='metrics.jsonl', prometheus_dir='', enabled=True):
+        self.component = component
+        self.jsonl_file = jsonl_file
+        self.prometheus_dir = prometheus_dir
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.events = []
+        # {(metric name, sorted label items): value} for the Prometheus dump
+        self.totals = {}
+
+    def record(self, event, **fields):
+        """Buffer one event; numeric fields are also added to the running totals"""
+        if not self.enabled:
+            return
+        entry = {'ts': datetime.now().isoformat(timespec='milliseconds'),
+                 'component': self.component, 'event': event, **fields}
+        labels = tuple(sorted((k, str(v)) for k, v in fields.items() if isinstance(v, str)))
+        with self.lock:
+            self.events.append(entry)
+            self.add_total(f'{event}_total', labels, 1)
+            for key, value in fields.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    self.add_total(f'{event}_{key}', labels, value)
+
+    def add_total(self, name, labels, value):
+        key = (name, labels)
+        self.totals[key] = self.totals.get(key, 0) + value
+
+    @contextmanager
+    def timer(self, event, **fields):
+        """Time a block and record it as an event with a 'seconds' field"""
+        start = time.perf_counter()
+        try:
+            yield fields
+        finally:
+            self.record(event, seconds=round(time.perf_counter() - start, 6), **fields)
+
+    def flush(self):
+        """Append buffered events to the JSON-lines file and refresh the Prometheus dump"""
+        if not self.enabled:
+            return
+        with self.lock:
+            events, self.events = self.events, []
+            totals = dict(self.totals)
+        try:
+            if events and self.jsonl_file:
+                with open(self.jsonl_file, 'a') as f:
+                    for entry in events:
+                        f.write(json.dumps(entry) + '\n')
+            if self.prometheus_dir:
+                self.write_prometheus(totals)
+        except OSError as e:
+            print(f"Warning: Could not write metrics: {e}")
+
+    def write_prometheus(self, totals):
+        """Write running totals as Prometheus text exposition format"""
+        directory = Path(self.prometheus_dir)
+        directory.mkdir(parents=True, exist_ok=True)
+        lines = []
+        for (name, labels), value in sorted(totals.items()):
+            metric = f'leaderboard_{self.component}_{name}'
+            label_text = ','.join(f'{k}="{v}"' for k, v in labels)
+            lines.append(f'{metric}{{{label_text}}} {value}' if label_text else f'{metric} {value}')
+        path = directory / f'leaderboard_{self.component}.prom'
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        tmp_path.replace(path)
@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+
+class PageCache:
+    """Persistent cache of raw leaderboard pages, kept per contest and per offset"""
+
+    def __init__(self, cache_dir='Cache'):
+        self.root = Path(cache_dir)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def content_hash(models):
+        """Stable hash of a page's models"""
+        payload = json.dumps(models, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        return hashlib.sha256(payload).hexdigest()
+
+    @staticmethod
+    def write_json(path, data):
+        """Write JSON atomically so an interrupted run never leaves a torn file"""
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def read_json(path):
+        """Read a JSON file, or None if it is missing or unreadable"""
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def contest_dir(self, contest):
+        path = self.root / contest
+        path.mkdir(exist_ok=True)
+        return path
+
+    def load_page(self, contest, offset, limit):
+        """Cached entry for one page (models, etag, last_modified, hash), or None"""
+        entry = self.read_json(self.contest_dir(contest) / f'{offset}.json')
+        if entry is None or entry.get('limit') != limit:
+            return None
+        return entry
+
+    def store_page(self, contest, offset, limit, models, etag=None, last_modified=None):
+        """Store a page and return True if its content differs from the cached copy"""
+        previous = self.load_page(contest, offset, limit)
+        digest = self.content_hash(models)
+        self.write_json(self.contest_dir(contest) / f'{offset}.json', {
+            'limit': limit,
+            'models': models,
+            'etag': etag,
+            'last_modified': last_modified,
+            'hash': digest
+        })
+        return previous is None or previous.get('hash') != digest
+
+    def load_meta(self, contest):
+        """Offsets of the last complete fetch for a contest"""
+        return self.read_json(self.contest_dir(contest) / 'meta.json') or {}
+
+    def store_meta(self, contest, limit, offsets):
+        """Record the page offsets of a complete fetch and drop stale pages"""
+        contest_dir = self.contest_dir(contest)
+        keep = {f'{offset}.json' for offset in offsets}
+        for page_file in contest_dir.glob('*.json'):
+            if page_file.stem.isdigit() and page_file.name not in keep:
+                page_file.unlink(missing_ok=True)
+        self.write_json(contest_dir / 'meta.json', {'limit': limit, 'offsets': sorted(offsets), 'complete': True})
+
+    def complete_offsets(self, contest, limit):
+        """Offsets of the last complete fetch if every one of its pages is still cached, else None"""
+        meta = self.load_meta(contest)
+        if not meta.get('complete') or meta.get('limit') != limit:
+            return None
+        contest_dir = self.contest_dir(contest)
+        if not all((contest_dir / f'{offset}.json').exists() for offset in meta['offsets']):
+            return None
+        return meta['offsets']
+
+    def cached_pages(self, contest, limit):
+        """All pages of the last complete fetch in offset order, or None"""
+        meta = self.load_meta(contest)
+        if not meta.get('complete') or meta.get('limit') != limit:
+            return None
+        pages = []
+        for offset in meta['offsets']:
+            entry = self.load_page(contest, offset, limit)
+            if entry is None:
+                return None
+            pages.append(entry['models'])
+        return pages
+
+    def load_progress(self, contest):
+        """Checkpoint of a contest fetch that has not completed yet"""
+        return self.read_json(self.contest_dir(contest) / 'progress.json')
+
+    def store_progress(self, contest, progress):
+        self.write_json(self.contest_dir(contest) / 'progress.json', progress)
+
+    def clear_progress(self, contest):
+        (self.contest_dir(contest) / 'progress.json').unlink(missing_ok=True)
+
+    def load_state(self, name):
+        """Small named state record kept at the cache root"""
+        return self.read_json(self.root / f'{name}.json')
+
+    def store_state(self, name, data):
+        self.write_json(self.root / f'{name}.json', data)
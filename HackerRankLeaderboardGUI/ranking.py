@@ -0,0 +1,223 @@
+from bisect import bisect_left, bisect_right, insort
+
+# How tied participants (same score and same time) are ranked:
+#   competition  1, 2, 2, 4   (shared rank, gap after the tie)
+#   dense        1, 2, 2, 3   (shared rank, no gap)
+#   unique       1, 2, 3, 4   (one rank per row, ties in arrival order)
+TIE_METHODS = ('competition', 'dense', 'unique')
+
+
+def sort_board(df, score_column, time_column='Time'):
+    """Score high to low, then time low to high with missing times last; ties keep their order"""
+    by = [score_column] + ([time_column] if time_column in df.columns else [])
+    return df.sort_values(by=by, ascending=[False] + [True] * (len(by) - 1), kind='stable')
+
+
+def tie_ranks(sorted_df, score_column, time_column='Time', method='competition'):
+    """Rank numbers for an already sorted board"""
+    import numpy as np
+
+    count = len(sorted_df)
+    positions = np.arange(1, count + 1)
+    if method == 'unique' or count == 0:
+        return positions
+
+    scores = sorted_df[score_column].to_numpy(dtype='float64')
+    tied = scores[1:] == scores[:-1]
+    if time_column in sorted_df.columns:
+        times = sorted_df[time_column].astype('float64').to_numpy(dtype='float64', na_value=np.nan)
+        tied &= (times[1:] == times[:-1]) | (np.isnan(times[1:]) & np.isnan(times[:-1]))
+    starts = np.ones(count, dtype=bool)
+    starts[1:] = ~tied
+
+    if method == 'dense':
+        return np.cumsum(starts)
+    # Every row takes the position of the first row of its tie group
+    return np.maximum.accumulate(np.where(starts, positions, 0))
+
+
+def rank_board(df, score_column, time_column='Time', method='competition'):
+    """Sorted copy of a board with a leading Rank column"""
+    df = sort_board(df, score_column, time_column)
+    df.insert(0, 'Rank', tie_ranks(df, score_column, time_column, method))
+    return df
+
+
+def top_k(df, k, score_column, time_column='Time', method='competition'):
+    """The k best rows (plus anyone tied with the k-th) without sorting the whole board
+
+    The k-th best score is found with a linear-time partition; only rows
+    scoring at least that much are sorted and ranked. Unique ranks share no
+    rank, so they are cut at exactly k rows.
+    """
+    import numpy as np
+
+    if k <= 0 or k >= len(df):
+        return rank_board(df, score_column, time_column, method)
+    scores = df[score_column].to_numpy(dtype='float64')
+    threshold = np.partition(scores, len(scores) - k)[len(scores) - k]
+    candidates = sort_board(df[scores >= threshold], score_column, time_column)
+    if method == 'unique':
+        top = candidates.iloc[:k].copy()
+    else:
+        top = candidates[tie_ranks(candidates, score_column, time_column, 'competition') <= k]
+    top.insert(0, 'Rank', tie_ranks(top, score_column, time_column, method))
+    return top
+
+
+def assign_ranks(rows, tie_key, method='competition'):
+    """(rank, row) for rows that arrive already sorted; tie_key(row) is equal for tied rows"""
+    previous = object()
+    rank = 0
+    for position, row in enumerate(rows, 1):
+        key = tie_key(row)
+        if key != previous:
+            rank = position if method == 'competition' else rank + 1
+            previous = key
+        yield (position if method == 'unique' else rank), row
+
+
+class IncrementalRanker:
+    """Standings kept in a sorted list, so a scrape that changes a few scores costs a few bisects
+
+    Entries are ordered by score (high first), time (low first, missing
+    last) and then by their order among the rows tied with them, which
+    callers take from the board so that unique ranks and the order inside
+    a tie match the board's own Rank column. The distinct (score, time)
+    standings are kept in a sorted list of their own, so every rank and
+    rank-to-position lookup, dense ones included, is a binary search.
+    """
+
+    # A sync that moves more than this share of the standings re-sorts them all
+    # instead of moving entries one by one
+    REBUILD_SHARE = 0.05
+
+    def __init__(self):
+        self.keys = []
+        self.entries = {}  # name -> sort key
+        self.standings = []  # distinct key[:3], sorted
+        self.tied = {}  # standing -> entries holding it
+
+    def __len__(self):
+        return len(self.keys)
+
+    @staticmethod
+    def sort_key(name, score, time_taken, tie_order=0):
+        return (-score, time_taken is None, time_taken or 0, tie_order, name)
+
+    def update(self, name, score, time_taken=None, tie_order=0):
+        """Set one participant's standing; returns False when nothing changed"""
+        return self.place(name, self.sort_key(name, score, time_taken, tie_order))
+
+    def place(self, name, key):
+        old = self.entries.get(name)
+        if old == key:
+            return False
+        if old is not None:
+            self.drop_key(old)
+        insort(self.keys, key)
+        self.entries[name] = key
+        standing = key[:3]
+        if standing not in self.tied:
+            insort(self.standings, standing)
+        self.tied[standing] = self.tied.get(standing, 0) + 1
+        return True
+
+    def remove(self, name):
+        old = self.entries.pop(name, None)
+        if old is not None:
+            self.drop_key(old)
+
+    def drop_key(self, key):
+        del self.keys[bisect_left(self.keys, key)]
+        standing = key[:3]
+        self.tied[standing] -= 1
+        if not self.tied[standing]:
+            del self.tied[standing]
+            del self.standings[bisect_left(self.standings, standing)]
+
+    def sync(self, rows):
+        """Apply a full scrape of (name, score, time, tie order) rows; returns how many standings moved
+
+        A repeated name keeps its last row.
+        """
+        fresh = {name: self.sort_key(name, score, time_taken, tie_order)
+                 for name, score, time_taken, tie_order in rows}
+        changed = [name for name, key in fresh.items() if self.entries.get(name) != key]
+        gone = [name for name in self.entries if name not in fresh]
+        if len(changed) + len(gone) > len(fresh) * self.REBUILD_SHARE:
+            self.entries = fresh
+            self.keys = sorted(fresh.values())
+            self.tied = {}
+            for key in self.keys:
+                self.tied[key[:3]] = self.tied.get(key[:3], 0) + 1
+            self.standings = list(self.tied)
+        else:
+            for name in gone:
+                self.remove(name)
+            for name in changed:
+                self.place(name, fresh[name])
+        return len(changed) + len(gone)
+
+    def copy(self):
+        """Independent copy, to sync while readers keep using this one"""
+        ranker = IncrementalRanker()
+        ranker.keys = list(self.keys)
+        ranker.entries = dict(self.entries)
+        ranker.standings = list(self.standings)
+        ranker.tied = dict(self.tied)
+        return ranker
+
+    def standing_rank(self, standing, method='competition'):
+        """Rank of the first entry with a (score, time) standing"""
+        if method == 'dense':
+            return bisect_left(self.standings, standing) + 1
+        # Keys are 5-tuples; the 3-tuple standing sorts before every key tied with it
+        return bisect_left(self.keys, standing) + 1
+
+    def rank(self, name, method='competition'):
+        """Rank of one participant"""
+        key = self.entries[name]
+        if method == 'unique':
+            return bisect_left(self.keys, key) + 1
+        return self.standing_rank(key[:3], method)
+
+    def offset_of_rank(self, rank, method='competition'):
+        """Position of the first entry ranked rank or lower"""
+        rank = max(rank, 1)
+        if method == 'dense':
+            # The rank-th distinct standing starts where dense rank reaches rank
+            if rank > len(self.standings):
+                return len(self.keys)
+            return bisect_left(self.keys, self.standings[rank - 1])
+        # Competition and unique ranks never exceed the 1-based position
+        position = min(rank - 1, len(self.keys))
+        if method == 'unique' or position == len(self.keys):
+            return position
+        standing = self.keys[position][:3]
+        if bisect_left(self.keys, standing) == position:
+            return position
+        # Tied with the entry above, so ranked higher than asked: skip to the next standing
+        following = bisect_right(self.standings, standing)
+        if following == len(self.standings):
+            return len(self.keys)
+        return bisect_left(self.keys, self.standings[following])
+
+    def page(self, offset=0, limit=100, method='competition'):
+        """(rank, name, score, time) for a slice of the standings"""
+        rows = []
+        previous = None
+        rank = 0
+        for position, key in enumerate(self.keys[offset:offset + limit], offset + 1):
+            standing = key[:3]
+            if standing != previous:
+                if previous is None:
+                    # The first row of the page may be tied with rows before it
+                    rank = self.standing_rank(standing, method)
+                elif method == 'competition':
+                    rank = position
+                else:
+                    rank += 1
+                previous = standing
+            rows.append((position if method == 'unique' else rank, key[4], -key[0], None if key[1] else key[2]))
+        return rows
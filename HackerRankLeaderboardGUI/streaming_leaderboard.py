@@ -0,0 +1,107 @@
+import heapq
+import itertools
+import pickle
+import tempfile
+from pathlib import Path
+
+
+def contest_rank_key(row):
+    """(name, score, time, seq): score high to low, time low to high with missing last, then arrival"""
+    _, score, time_taken, seq = row
+    return (-score, time_taken is None, time_taken or 0, seq)
+
+
+def total_rank_key(row):
+    """(name, scores, total, time, first_seq): total high to low, then time, then first appearance"""
+    _, _, total, time_taken, first_seq = row
+    return (-total, time_taken is None, time_taken or 0, first_seq)
+
+
+def name_key(row):
+    """(name, seq, contest index, score, time): grouped by name, in arrival order"""
+    return row[0], row[1]
+
+
+class SortedRuns:
+    """Spill rows to sorted runs on disk and merge them back in key order
+
+    At most run_size rows are held in memory; each full buffer is sorted and
+    pickled to its own file, and merged() streams the k-way heapq.merge of
+    all runs, so memory stays flat however many rows pass through.
+    """
+
+    # Rows per pickle record; each record is loaded on its own, so reading
+    # a run never holds more than one chunk
+    CHUNK_ROWS = 1024
+
+    def __init__(self, work_dir, key, run_size=100000):
+        self.work_dir = Path(work_dir)
+        self.key = key
+        self.run_size = max(1, run_size)
+        self.buffer = []
+        self.run_files = []
+
+    def add(self, row):
+        self.buffer.append(row)
+        if len(self.buffer) >= self.run_size:
+            self.spill()
+
+    def spill(self):
+        """Sort the buffered rows and write them out as one run"""
+        if not self.buffer:
+            return
+        self.buffer.sort(key=self.key)
+        run_file = tempfile.NamedTemporaryFile(dir=self.work_dir, suffix='.run', delete=False)
+        with run_file:
+            for start in range(0, len(self.buffer), self.CHUNK_ROWS):
+                pickle.dump(self.buffer[start:start + self.CHUNK_ROWS], run_file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.run_files.append(run_file.name)
+        self.buffer = []
+
+    @staticmethod
+    def read_run(path):
+        with open(path, 'rb') as f:
+            while True:
+                try:
+                    chunk = pickle.load(f)
+                except EOFError:
+                    return
+                yield from chunk
+
+    def merged(self):
+        """All rows in key order"""
+        self.spill()
+        return heapq.merge(*(self.read_run(path) for path in self.run_files), key=self.key)
+
+
+def iter_rows(pages):
+    """(name, score, time or None) for every model in a stream of pages"""
+    for models in pages:
+        for item in models:
+            try:
+                time_taken = int(item['time_taken'])
+            except (KeyError, TypeError, ValueError):
+                time_taken = None
+            yield item['hacker'], float(item['score']), time_taken
+
+
+def combine_by_name(name_runs, contest_count, work_dir, run_size):
+    """Fold the name-sorted (name, seq, contest, score, time) runs of every contest into ranked combined rows
+
+    A name repeated inside one contest keeps its last score and time, as in
+    the in-memory merge; participants tie-break on their first appearance.
+    """
+    ranked = SortedRuns(work_dir, total_rank_key, run_size)
+    rows = heapq.merge(*(runs.merged() for runs in name_runs), key=name_key)
+    for name, group in itertools.groupby(rows, key=lambda row: row[0]):
+        scores = [0.0] * contest_count
+        times = [None] * contest_count
+        first_seq = None
+        for _, seq, contest, score, time_taken in group:
+            if first_seq is None:
+                first_seq = seq
+            scores[contest] = score
+            times[contest] = time_taken
+        present = [t for t in times if t is not None]
+        ranked.add((name, scores, sum(scores), sum(present) if present else None, first_seq))
+    return ranked
@@ -0,0 +1,150 @@
+import json
+import tempfile
+import threading
+import time
+import unittest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+import requests
+
+from fetch_engine import LeaderboardFetcher, FetchStats
+from page_cache import PageCache
+
+
+class StubLeaderboard(BaseHTTPRequestHandler):
+    """Serves /rest/contests/<contest>/leaderboard pages from server.sizes"""
+
+    # Keep-alive, so pooled connections can be told apart from new ones
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        url = urlsplit(self.path)
+        contest = url.path.split('/')[3]
+        query = parse_qs(url.query)
+        offset, limit = int(query['offset'][0]), int(query['limit'][0])
+        with server.lock:
+            server.requests.append(offset)
+            server.client_ports.add(self.client_address[1])
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            failing = server.failures.get(offset, 0)
+            if failing:
+                server.failures[offset] = failing - 1
+        try:
+            time.sleep(server.delay)
+            if failing:
+                self.send_response(503)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            size = server.sizes.get(contest, 0)
+            models = [{'hacker': f'{contest}-{rank}', 'score': size - rank, 'time_taken': rank}
+                      for rank in range(offset, min(offset + limit, size))]
+            body = json.dumps({'models': models, 'total': size}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+
+class FetchEngineTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubLeaderboard)
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.server.sizes = {'weekly': 1050}
+        self.server.delay = 0.02
+        self.server.failures = {}  # offset -> how many more times it answers 503
+        self.server.requests = []
+        self.server.client_ports = set()
+        self.server.in_flight = self.server.max_in_flight = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        self.fetchers = []
+
+    def tearDown(self):
+        for fetcher in self.fetchers:
+            fetcher.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def fetcher(self, max_offset=0, concurrency=4, **kwargs):
+        kwargs.setdefault('backoff_base', 0.01)
+        fetcher = LeaderboardFetcher(self.base_url, 'test', 5, 100, max_offset, concurrency, **kwargs)
+        self.fetchers.append(fetcher)
+        return fetcher
+
+    @staticmethod
+    def hackers(pages):
+        return [model['hacker'] for page in pages for model in page]
+
+    def test_pages_come_back_in_offset_order(self):
+        result = self.fetcher().fetch_pages('weekly')
+        self.assertEqual(self.hackers(result.pages), [f'weekly-{rank}' for rank in range(1050)])
+        self.assertEqual([len(page) for page in result.pages], [100] * 10 + [50])
+        self.assertFalse(result.truncated)
+
+    def test_stops_scheduling_after_a_short_page(self):
+        result = self.fetcher(concurrency=4).fetch_pages('weekly')
+        # 11 pages, plus at most the pages already in flight past the short one
+        self.assertLessEqual(result.stats.requests, 11 + 3)
+        self.assertLessEqual(max(self.server.requests), 1000 + 3 * 100)
+
+    def test_empty_contest(self):
+        result = self.fetcher().fetch_pages('nobody')
+        self.assertEqual(self.hackers(result.pages), [])
+
+    def test_bounded_requests_in_flight_over_pooled_connections(self):
+        self.fetcher(concurrency=3).fetch_pages('weekly')
+        self.assertGreater(self.server.max_in_flight, 1)
+        self.assertLessEqual(self.server.max_in_flight, 3)
+        # Connections are reused across pages instead of one per request
+        self.assertLessEqual(len(self.server.client_ports), 3)
+        self.assertGreater(len(self.server.requests), len(self.server.client_ports))
+
+    def test_max_offset_caps_the_fetch(self):
+        result = self.fetcher(max_offset=300).fetch_pages('weekly')
+        self.assertEqual(len(self.hackers(result.pages)), 300)
+        self.assertTrue(result.truncated)
+
+    def test_iter_pages_matches_fetch_pages(self):
+        fetcher = self.fetcher(concurrency=2)
+        stats = FetchStats()
+        self.assertEqual(list(fetcher.iter_pages('weekly', stats)), fetcher.fetch_pages('weekly').pages)
+        self.assertFalse(stats.truncated)
+
+    def test_retries_a_failing_page(self):
+        self.server.failures = {200: 2}
+        result = self.fetcher(max_retries=3).fetch_pages('weekly')
+        self.assertEqual(len(self.hackers(result.pages)), 1050)
+        self.assertEqual(result.stats.retries, 2)
+
+    def test_failed_fetch_resumes_from_checkpointed_pages(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = PageCache(cache_dir)
+            self.server.failures = {500: 99}
+            with self.assertRaises(requests.RequestException):
+                self.fetcher(max_retries=0, cache=cache).fetch_pages('weekly')
+            checkpointed = set(cache.load_progress('weekly')['pages'])
+            self.assertIn('0', checkpointed)
+            self.assertNotIn('500', checkpointed)
+
+            self.server.failures = {}
+            self.server.requests.clear()
+            result = self.fetcher(cache=cache).fetch_pages('weekly')
+            self.assertEqual(self.hackers(result.pages), [f'weekly-{rank}' for rank in range(1050)])
+            self.assertEqual(result.stats.resumed_pages, len(checkpointed))
+            self.assertTrue(set(self.server.requests).isdisjoint(int(offset) for offset in checkpointed))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,198 @@
+import json
+import os
+import re
+import tempfile
+import unittest
+
+from gspread.utils import a1_range_to_grid_range
+
+from google_sheets_uploader import GoogleSheetsUploader
+
+
+class FakeWorksheet:
+    """Worksheet grid kept as {(row, col): value}, 0-based"""
+
+    def __init__(self, sheet_id, title, row_count, col_count):
+        self.id = sheet_id
+        self.title = title
+        self.row_count = row_count
+        self.col_count = col_count
+        self.cells = {}
+
+    def grid(self):
+        """Cell values as rows, with trailing blank cells and rows dropped"""
+        rows = [[] for _ in range(max((row for row, _ in self.cells), default=-1) + 1)]
+        for (row, col), value in sorted(self.cells.items()):
+            rows[row].extend([""] * (col - len(rows[row])))
+            rows[row].append(value)
+        return trim(rows)
+
+
+class FakeSpreadsheet:
+    """Applies batch_update and values_batch_update bodies the way Google Sheets does"""
+
+    def __init__(self):
+        self.sheets = {}
+        self.calls = []
+
+    def worksheets(self):
+        return list(self.sheets.values())
+
+    def batch_update(self, body):
+        self.calls.append(('batch_update', [next(iter(request)) for request in body['requests']]))
+        by_id = {worksheet.id: worksheet for worksheet in self.sheets.values()}
+        for request in body['requests']:
+            if 'addSheet' in request:
+                properties = request['addSheet']['properties']
+                grid = properties['gridProperties']
+                self.sheets[properties['title']] = FakeWorksheet(
+                    len(self.sheets) + 1, properties['title'], grid['rowCount'], grid['columnCount'])
+            elif 'updateSheetProperties' in request:
+                properties = request['updateSheetProperties']['properties']
+                worksheet = by_id[properties['sheetId']]
+                worksheet.row_count = properties['gridProperties']['rowCount']
+                worksheet.col_count = properties['gridProperties']['columnCount']
+            elif 'updateCells' in request:
+                by_id[request['updateCells']['range']['sheetId']].cells = {}
+
+    def values_batch_update(self, body):
+        ranges = [re.match(r"^'((?:[^']|'')*)'!(.*)$", entry['range']).groups() for entry in body['data']]
+        self.calls.append(('values_batch_update', [a1_range for _, a1_range in ranges]))
+        for entry, (title, a1_range) in zip(body['data'], ranges):
+            worksheet = self.sheets[title.replace("''", "'")]
+            grid_range = a1_range_to_grid_range(a1_range)
+            assert grid_range['endRowIndex'] <= worksheet.row_count, 'range outside the worksheet grid'
+            assert grid_range['endColumnIndex'] <= worksheet.col_count, 'range outside the worksheet grid'
+            for row_idx, row in enumerate(entry['values']):
+                for col_idx, value in enumerate(row):
+                    worksheet.cells[(grid_range['startRowIndex'] + row_idx,
+                                     grid_range['startColumnIndex'] + col_idx)] = value
+
+
+class FakeClient:
+    def __init__(self):
+        self.spreadsheet = FakeSpreadsheet()
+
+    def open_by_key(self, key):
+        return self.spreadsheet
+
+
+def trim(rows):
+    """Rows without trailing blank cells, and without trailing empty rows"""
+    rows = [list(row) for row in rows]
+    for row in rows:
+        while row and row[-1] == "":
+            row.pop()
+    while rows and not rows[-1]:
+        rows.pop()
+    return rows
+
+
+def board(count, bump=()):
+    """Headers and string rows of a small leaderboard; rows in bump score one point more"""
+    headers = ['Rank', 'Name', 'Score']
+    rows = [[str(rank), f'hacker{rank}', str(100 - rank + (rank in bump))] for rank in range(1, count + 1)]
+    return headers, rows
+
+
+class SheetDeltaTest(unittest.TestCase):
+    def test_consecutive_changed_rows_share_one_range(self):
+        old = [['a'], ['b'], ['c'], ['d'], ['e']]
+        new = [['a'], ['B'], ['C'], ['d'], ['E']]
+        delta = GoogleSheetsUploader.compute_sheet_delta(old, new)
+        self.assertEqual(delta, [{'range': 'A2:A3', 'values': [['B'], ['C']]},
+                                 {'range': 'A5:A5', 'values': [['E']]}])
+
+    def test_removed_rows_and_cells_are_blanked(self):
+        old = [['a', 'b', 'c'], ['d', 'e'], ['f']]
+        new = [['a', 'b'], ['d', 'e']]
+        delta = GoogleSheetsUploader.compute_sheet_delta(old, new)
+        self.assertEqual(delta, [{'range': 'A1:C1', 'values': [['a', 'b', '']]},
+                                 {'range': 'A3:A3', 'values': [['']]}])
+
+    def test_unchanged_grid_sends_nothing(self):
+        grid = [['a', 'b'], ['c', 'd']]
+        self.assertEqual(GoogleSheetsUploader.compute_sheet_delta(grid, grid), [])
+
+
+class UploadBoardsTest(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.work_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.work_dir.name)
+        with open('uploader_config.json', 'w') as f:
+            json.dump({'SPREADSHEET_ID': 'sheet', 'UPLOAD_MODE': 'diff', 'METRICS_ENABLED': False}, f)
+        self.uploader = GoogleSheetsUploader()
+        self.uploader.gc = FakeClient()
+        self.spreadsheet = self.uploader.gc.spreadsheet
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.work_dir.cleanup()
+
+    def upload(self, headers, rows, title='Leaderboard'):
+        self.spreadsheet.calls.clear()
+        self.assertTrue(self.uploader.upload_boards([(title, headers, rows)]))
+        worksheet = self.spreadsheet.sheets[title]
+        # Row 1 is the upload timestamp
+        self.assertTrue(worksheet.grid()[0][0].startswith('Last Updated: '))
+        self.assertEqual(worksheet.grid()[1:], trim([headers] + rows))
+        return worksheet
+
+    def cleared(self):
+        return any(call[0] == 'batch_update' and 'updateCells' in call[1] for call in self.spreadsheet.calls)
+
+    def test_grow_change_and_shrink_cycles(self):
+        self.upload(*board(5))
+        self.assertEqual(self.spreadsheet.calls[0], ('batch_update', ['addSheet']))
+
+        # Grows past the worksheet grid, which is resized first
+        worksheet = self.spreadsheet.sheets['Leaderboard']
+        worksheet.row_count = 6
+        self.upload(*board(12))
+        self.assertIn(('batch_update', ['updateSheetProperties']), self.spreadsheet.calls)
+        self.assertFalse(self.cleared())
+
+        # A few changed scores: two separate blocks of rows, plus the timestamp when it moved on
+        self.upload(*board(12, bump=(3, 4, 9)))
+        (call, ranges), = self.spreadsheet.calls
+        self.assertEqual(call, 'values_batch_update')
+        self.assertEqual([a1_range for a1_range in ranges if a1_range != 'A1:A1'], ['A5:C6', 'A11:C11'])
+
+        # Shrinks, and loses a column: leftovers are blanked rather than cleared
+        headers, rows = board(4)
+        self.upload(headers[:2], [row[:2] for row in rows])
+        self.assertFalse(self.cleared())
+
+        # And grows back
+        self.upload(*board(7, bump=(1,)))
+
+    def test_full_mode_rewrites_the_worksheet(self):
+        self.uploader.upload_mode = 'full'
+        self.upload(*board(6))
+        self.upload(*board(3))
+        self.assertTrue(self.cleared())
+        self.upload(*board(3))
+        self.assertTrue(self.cleared())
+
+    def test_missing_shadow_falls_back_to_a_full_upload(self):
+        self.upload(*board(6))
+        os.remove(self.uploader.shadow_file)
+        self.upload(*board(2))
+        self.assertTrue(self.cleared())
+        # The shadow is rebuilt, so the next upload is a diff again
+        self.upload(*board(2, bump=(2,)))
+        self.assertFalse(self.cleared())
+
+    def test_boards_go_to_their_own_worksheets_in_one_values_call(self):
+        self.spreadsheet.calls.clear()
+        boards = [('Leaderboard',) + board(4), ('week-1',) + board(2)]
+        self.assertTrue(self.uploader.upload_boards(boards))
+        self.assertEqual([(call, len(items)) for call, items in self.spreadsheet.calls],
+                         [('batch_update', 2), ('values_batch_update', 2)])
+        for title, headers, rows in boards:
+            self.assertEqual(self.spreadsheet.sheets[title].grid()[1:], [headers] + rows)
+
+
+if __name__ == '__main__':
+    unittest.main()
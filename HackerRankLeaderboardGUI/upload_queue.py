@@ -0,0 +1,86 @@
+import json
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timedelta
+from pathlib import Path
+
+
+class UploadQueue:
+    """Offline upload queue kept in SQLite, one entry per target worksheet
+
+    Queueing a target again replaces its entry, so however many upload
+    intervals an outage spans, flushing the queue costs one upload per target.
+    Each entry remembers its failed attempts until it is uploaded.
+    """
+
+    def __init__(self, db_file='upload_queue.db'):
+        self.db_file = db_file
+
+    def connect(self):
+        conn = sqlite3.connect(self.db_file)
+        conn.row_factory = sqlite3.Row
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS pending_uploads (
+                target     TEXT PRIMARY KEY,
+                file_path  TEXT NOT NULL,
+                queued_at  TEXT NOT NULL,
+                attempts   INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT
+            )""")
+        return conn
+
+    def add(self, target, file_path, queued_at=None):
+        """Queue the latest snapshot of a target, replacing any older entry for it"""
+        queued_at = queued_at or datetime.now().isoformat()
+        with closing(self.connect()) as conn, conn:
+            conn.execute("""
+                INSERT INTO pending_uploads (target, file_path, queued_at) VALUES (?, ?, ?)
+                ON CONFLICT(target) DO UPDATE SET file_path = excluded.file_path,
+                                                  queued_at = excluded.queued_at""",
+                         (target, str(file_path), queued_at))
+
+    def pending(self):
+        """Queued entries, oldest first"""
+        if not Path(self.db_file).exists():
+            return []
+        with closing(self.connect()) as conn:
+            rows = conn.execute('SELECT * FROM pending_uploads ORDER BY queued_at').fetchall()
+        return [dict(row) for row in rows]
+
+    def mark_done(self, targets):
+        """Drop entries that were uploaded"""
+        with closing(self.connect()) as conn, conn:
+            conn.executemany('DELETE FROM pending_uploads WHERE target = ?', [(t,) for t in targets])
+
+    def mark_failed(self, targets, error):
+        """Keep entries that could not be uploaded, counting the attempt"""
+        with closing(self.connect()) as conn, conn:
+            conn.executemany('UPDATE pending_uploads SET attempts = attempts + 1, last_error = ? WHERE target = ?',
+                             [(error, t) for t in targets])
+
+    def compact(self, max_age_hours):
+        """Drop entries older than max_age_hours or whose file is gone; returns how many"""
+        entries = self.pending()
+        cutoff = datetime.now() - timedelta(hours=max_age_hours)
+        stale = [entry['target'] for entry in entries
+                 if datetime.fromisoformat(entry['queued_at']) <= cutoff or not Path(entry['file_path']).exists()]
+        if stale:
+            self.mark_done(stale)
+            with closing(sqlite3.connect(self.db_file)) as conn:
+                conn.execute('VACUUM')
+        return len(stale)
+
+    def migrate_json(self, json_file, target_for):
+        """Import a legacy pending_uploads.json list (newest entry per target wins) and remove it"""
+        json_file = Path(json_file)
+        if not json_file.exists():
+            return 0
+        try:
+            with open(json_file, 'r') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            entries = []
+        for entry in sorted(entries, key=lambda e: e.get('timestamp', '')):
+            self.add(target_for(Path(entry['file_path']).stem), entry['file_path'], entry.get('timestamp'))
+        json_file.unlink()
+        return len(entries)